@@ -6,19 +6,23 @@ in the Pyunto Intelligence API.
 """
 
 import os
+import sys
 import time
+import gzip
 import json
 import logging
+import tempfile
 import threading
-import requests
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from collections import defaultdict, deque
-from typing import Dict, List, Optional, Union, Callable, Tuple, Any, Set
+from typing import Dict, List, Optional, Union, Callable, Tuple, Any, Set, Iterator
 from enum import Enum
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Fall back to the standard json module
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -30,6 +34,47 @@ logging.basicConfig(
 )
 logger = logging.getLogger("pyunto_error_detector")
 
+NS_PER_SECOND = 1_000_000_000
+
+
+# Start of the Unix epoch, for exact integer datetime conversions
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _ns_to_datetime(ns: int) -> datetime:
+    """Convert epoch nanoseconds to a naive local datetime (microsecond precision)."""
+    return (EPOCH + timedelta(microseconds=ns // 1000)).astimezone().replace(tzinfo=None)
+
+
+def _datetime_to_ns(dt: datetime) -> int:
+    """Convert a datetime (naive means local time) to epoch nanoseconds, exactly."""
+    return (dt.astimezone(timezone.utc) - EPOCH) // timedelta(microseconds=1) * 1000
+
+
+class _StreamedMapping(dict):
+    """
+    A dict whose items are produced on demand, so JSONEncoder.iterencode can
+    stream a large mapping without building it in memory.
+    """
+    
+    def __init__(self, items_factory: Callable[[], Iterator[Tuple[str, Any]]]):
+        super().__init__()
+        self._items_factory = items_factory
+    
+    def items(self):
+        return self._items_factory()
+    
+    def __bool__(self):
+        # The encoder writes "{}" for falsy dicts without asking for items
+        return True
+
+
+def _open_config_file(file_path: str, mode: str):
+    """Open a config file, using fast gzip compression for .gz paths."""
+    if file_path.endswith(".gz"):
+        return gzip.open(file_path, mode, compresslevel=1)
+    return open(file_path, mode)
+
 
 class RecoveryStrategy(Enum):
     """Recovery strategies for API errors."""
@@ -52,6 +97,20 @@ class ErrorDetector:
     - Alerting for critical errors
     """
     
+    # Strategy name -> enum member, so config values are resolved with a dict lookup
+    _STRATEGY_LOOKUP = {s.value: s for s in RecoveryStrategy}
+    
+    # Config key -> setter applied by import_config
+    _CONFIG_SETTERS = {
+        "log_file": lambda self, value: setattr(self, "log_file", value),
+        "alert_email": lambda self, value: setattr(self, "alert_email", value),
+        "alert_webhook": lambda self, value: setattr(self, "alert_webhook", value),
+        "circuit_breaker_threshold": lambda self, value: setattr(self, "CIRCUIT_BREAKER_THRESHOLD", value),
+        "circuit_breaker_reset_timeout": lambda self, value: self.circuit_breaker.__setitem__("reset_timeout", value),
+        "max_retries": lambda self, value: setattr(self, "MAX_RETRIES", value),
+        "retry_base_delay": lambda self, value: setattr(self, "RETRY_BASE_DELAY", value),
+    }
+    
     def __init__(
         self,
         api_key: str,
@@ -77,8 +136,13 @@ class ErrorDetector:
         
         # Error tracking
         self.errors = deque(maxlen=max_errors_to_track)
+        self._error_times_ns = deque(maxlen=max_errors_to_track)  # Epoch ns, aligned with self.errors
+        self._error_code_ids = deque(maxlen=max_errors_to_track)  # Code ids, aligned with self.errors
+        self._code_ids = {}  # Error code -> dense id
+        self._code_names = []  # Dense id -> error code
+        self._endpoint_pool = {}  # Shared endpoint strings for stored records
         self.error_counts = defaultdict(int)  # Count by error code
-        self.error_patterns = defaultdict(list)  # Patterns by endpoint
+        self.error_patterns = defaultdict(list)  # Epoch ns timestamps by endpoint
         
         # Recovery strategies
         self.recovery_strategies = {}  # Strategies by error code
@@ -95,10 +159,23 @@ class ErrorDetector:
         self.detection_active = False
         self.detector_thread = None
         
+        # Custom alert handler state (alerts are delivered in batches)
+        self._custom_alert_handler = None
+        self._custom_alert_handler_batched = False
+        self._alert_queue = deque()
+        self._alert_queue_bytes = 0
+        self._alert_first_queued = 0.0
+        self._alert_last_queued = 0.0
+        self._alert_condition = threading.Condition()
+        self._alert_flusher_thread = None
+        
         # Constants
         self.CIRCUIT_BREAKER_THRESHOLD = 5  # failures
         self.MAX_RETRIES = 3
         self.RETRY_BASE_DELAY = 1  # seconds
+        self.ALERT_BATCH_MAX_DELAY = 0.1  # seconds since first queued alert
+        self.ALERT_BATCH_IDLE_DELAY = 0.05  # seconds since last queued alert
+        self.ALERT_BATCH_MAX_BYTES = 64 * 1024  # message bytes
         
         # Load existing error logs if available
         self._load_error_logs()
@@ -153,6 +230,9 @@ class ErrorDetector:
         if self.detector_thread:
             self.detector_thread.join(timeout=60)
         
+        # Deliver any alerts still waiting for the batch flusher
+        self._flush_custom_alerts()
+        
         logger.info("Pyunto Intelligence error detection stopped")
     
     def track_error(
@@ -173,12 +253,16 @@ class ErrorDetector:
             request_data: Optional request data for context
             response_data: Optional response data for context
         """
-        timestamp = datetime.now()
-        error_code = str(error_code)
+        timestamp_ns = time.time_ns()
+        # Keep microseconds, as in the ISO timestamp, so a record's own
+        # timestamp passed to search_errors still matches it
+        timestamp_ns -= timestamp_ns % 1000
+        error_code = sys.intern(str(error_code))
+        endpoint = self._endpoint_pool.setdefault(endpoint, endpoint)
         
         # Create error entry
         error_entry = {
-            "timestamp": timestamp.isoformat(),
+            "timestamp": _ns_to_datetime(timestamp_ns).isoformat(),
             "error_code": error_code,
             "error_message": error_message,
             "endpoint": endpoint,
@@ -188,17 +272,19 @@ class ErrorDetector:
         
         # Add to tracking structures
         self.errors.append(error_entry)
+        self._error_times_ns.append(timestamp_ns)
+        self._error_code_ids.append(self._get_code_id(error_code))
         self.error_counts[error_code] += 1
         
         # Add to pattern tracking
         pattern_key = f"{endpoint}:{error_code}"
-        self.error_patterns[pattern_key].append(timestamp)
+        self.error_patterns[pattern_key].append(timestamp_ns)
         
         # Clean up old pattern entries (older than 24 hours)
-        cutoff_time = timestamp - timedelta(hours=24)
+        cutoff_ns = timestamp_ns - 86400 * NS_PER_SECOND
         self.error_patterns[pattern_key] = [
             t for t in self.error_patterns[pattern_key]
-            if datetime.fromisoformat(t.isoformat()) > cutoff_time
+            if t > cutoff_ns
         ]
         
         # Log the error
@@ -218,6 +304,14 @@ class ErrorDetector:
         
         logger.debug(f"Tracked error {error_code} on {endpoint}: {error_message}")
     
+    def _get_code_id(self, error_code: str) -> int:
+        """Return the dense id for an error code, assigning one on first sight."""
+        code_id = self._code_ids.get(error_code)
+        if code_id is None:
+            code_id = self._code_ids[error_code] = len(self._code_names)
+            self._code_names.append(error_code)
+        return code_id
+    
     def get_error_summary(self) -> Dict[str, Any]:
         """
         Get a summary of recent errors.
@@ -225,20 +319,20 @@ class ErrorDetector:
         Returns:
             Dict containing error metrics
         """
-        now = datetime.now()
+        now_ns = time.time_ns()
         
         # Count errors in the last hour
-        hour_ago = now - timedelta(hours=1)
+        hour_ago_ns = now_ns - 3600 * NS_PER_SECOND
         errors_last_hour = sum(
-            1 for error in self.errors
-            if datetime.fromisoformat(error["timestamp"]) > hour_ago
+            1 for t in self._error_times_ns
+            if t > hour_ago_ns
         )
         
         # Count errors in the last day
-        day_ago = now - timedelta(days=1)
+        day_ago_ns = now_ns - 86400 * NS_PER_SECOND
         errors_last_day = sum(
-            1 for error in self.errors
-            if datetime.fromisoformat(error["timestamp"]) > day_ago
+            1 for t in self._error_times_ns
+            if t > day_ago_ns
         )
         
         # Most common error codes
@@ -271,7 +365,7 @@ class ErrorDetector:
             "circuit_breaker_status": circuit_breaker_status,
             "circuit_breaker_failure_count": self.circuit_breaker["failure_count"],
             "recovery_strategies_configured": len(self.recovery_strategies),
-            "timestamp": now.isoformat()
+            "timestamp": _ns_to_datetime(now_ns).isoformat()
         }
     
     def search_errors(
@@ -296,8 +390,10 @@ class ErrorDetector:
             List of matching error entries
         """
         results = []
+        start_ns = _datetime_to_ns(start_time) if start_time else None
+        end_ns = _datetime_to_ns(end_time) if end_time else None
         
-        for error in self.errors:
+        for error, error_time_ns in zip(self.errors, self._error_times_ns):
             # Apply filters
             if error_code and error["error_code"] != error_code:
                 continue
@@ -305,12 +401,10 @@ class ErrorDetector:
             if endpoint and error["endpoint"] != endpoint:
                 continue
             
-            error_time = datetime.fromisoformat(error["timestamp"])
-            
-            if start_time and error_time < start_time:
+            if start_ns is not None and error_time_ns < start_ns:
                 continue
                 
-            if end_time and error_time > end_time:
+            if end_ns is not None and error_time_ns > end_ns:
                 continue
             
             results.append(error)
@@ -364,7 +458,7 @@ class ErrorDetector:
     
     def _check_recurring_patterns(self):
         """Check for recurring error patterns."""
-        now = datetime.now()
+        hour_ago_ns = time.time_ns() - 3600 * NS_PER_SECOND
         
         for pattern_key, timestamps in self.error_patterns.items():
             if len(timestamps) < 5:
@@ -373,7 +467,7 @@ class ErrorDetector:
             # Only consider timestamps in the last hour
             recent_timestamps = [
                 t for t in timestamps
-                if (now - t).total_seconds() < 3600
+                if t > hour_ago_ns
             ]
             
             if len(recent_timestamps) >= 5:
@@ -389,8 +483,8 @@ class ErrorDetector:
                         "error_code": error_code,
                         "endpoint": endpoint,
                         "occurrences": len(recent_timestamps),
-                        "first_occurrence": min(recent_timestamps).isoformat(),
-                        "last_occurrence": max(recent_timestamps).isoformat()
+                        "first_occurrence": _ns_to_datetime(min(recent_timestamps)).isoformat(),
+                        "last_occurrence": _ns_to_datetime(max(recent_timestamps)).isoformat()
                     }
                 )
                 
@@ -406,7 +500,7 @@ class ErrorDetector:
         # Calculate time between errors
         intervals = []
         for i in range(1, len(timestamps)):
-            delta = (timestamps[i] - timestamps[i-1]).total_seconds()
+            delta = (timestamps[i] - timestamps[i-1]) / NS_PER_SECOND
             intervals.append(delta)
         
         # Check for very frequent errors (less than 10 seconds apart)
@@ -443,7 +537,12 @@ class ErrorDetector:
             return
         
         strategy_config = self.recovery_strategies[error_code]
-        strategy_type = RecoveryStrategy(strategy_config["strategy"]) if isinstance(strategy_config["strategy"], str) else strategy_config["strategy"]
+        strategy_type = strategy_config["strategy"]
+        if isinstance(strategy_type, str):
+            strategy_type = self._STRATEGY_LOOKUP.get(strategy_type)
+            if strategy_type is None:
+                logger.warning(f"Unknown recovery strategy for code {error_code}: {strategy_config['strategy']}")
+                return
         
         if strategy_type == RecoveryStrategy.RETRY:
             self._apply_retry_strategy(
@@ -507,6 +606,8 @@ class ErrorDetector:
             logger.warning("Cannot retry without request data")
             return False
         
+        import requests
+        
         for attempt in range(max_retries):
             try:
                 logger.info(f"Retry attempt {attempt + 1}/{max_retries} for {endpoint}")
@@ -553,6 +654,8 @@ class ErrorDetector:
             logger.warning("Cannot retry without request data")
             return False
         
+        import requests
+        
         for attempt in range(max_retries):
             try:
                 # Calculate backoff delay
@@ -600,6 +703,8 @@ class ErrorDetector:
             logger.warning("Cannot use fallback without request data or fallback endpoint")
             return False
         
+        import requests
+        
         try:
             logger.info(f"Attempting fallback to {fallback_endpoint}")
             
@@ -662,23 +767,37 @@ class ErrorDetector:
             logger.info(f"No error log file found at {self.log_file}")
             return
         
+        cutoff_ns = time.time_ns() - 86400 * NS_PER_SECOND
+        
+        # Bind per-line lookups to locals for the parse loop
+        loads = json.loads
+        intern = sys.intern
+        fromisoformat = datetime.fromisoformat
+        endpoint_pool = self._endpoint_pool
+        
         try:
             with open(self.log_file, "r") as f:
                 for line in f:
                     try:
-                        error = json.loads(line.strip())
+                        error = loads(line.strip())
+                        error["error_code"] = intern(str(error["error_code"]))
+                        error["endpoint"] = endpoint_pool.setdefault(error["endpoint"], error["endpoint"])
+                        
+                        # Parse the timestamp once; everything downstream uses epoch ns
+                        timestamp_ns = _datetime_to_ns(fromisoformat(error["timestamp"]))
                         
                         # Add to tracking structures
                         self.errors.append(error)
+                        self._error_times_ns.append(timestamp_ns)
+                        self._error_code_ids.append(self._get_code_id(error["error_code"]))
                         self.error_counts[error["error_code"]] += 1
                         
                         # Add to pattern tracking
                         pattern_key = f"{error['endpoint']}:{error['error_code']}"
-                        timestamp = datetime.fromisoformat(error["timestamp"])
                         
                         # Only add recent errors to patterns (last 24 hours)
-                        if (datetime.now() - timestamp).total_seconds() < 86400:  # 24 hours
-                            self.error_patterns[pattern_key].append(timestamp)
+                        if timestamp_ns > cutoff_ns:
+                            self.error_patterns[pattern_key].append(timestamp_ns)
                         
                     except Exception as e:
                         logger.warning(f"Failed to parse error log line: {str(e)}")
@@ -728,6 +847,68 @@ class ErrorDetector:
         
         if self.alert_webhook:
             self._send_webhook(alert_type, message, details)
+        
+        if self._custom_alert_handler:
+            self._queue_custom_alert(alert_type, message, details)
+    
+    def _queue_custom_alert(self, alert_type: str, message: str, details: Optional[Dict] = None):
+        """Queue an alert for batched delivery to the custom alert handler."""
+        with self._alert_condition:
+            now = time.monotonic()
+            if not self._alert_queue:
+                self._alert_first_queued = now
+            self._alert_last_queued = now
+            
+            self._alert_queue.append((alert_type, message, details))
+            self._alert_queue_bytes += len(message)
+            
+            if self._alert_flusher_thread is None:
+                self._alert_flusher_thread = threading.Thread(target=self._alert_flush_loop)
+                self._alert_flusher_thread.daemon = True
+                self._alert_flusher_thread.start()
+            
+            self._alert_condition.notify()
+    
+    def _alert_flush_loop(self):
+        """Deliver queued alerts once a batch is old, idle, or large enough."""
+        while True:
+            with self._alert_condition:
+                while not self._alert_queue:
+                    self._alert_condition.wait()
+                
+                while self._alert_queue_bytes < self.ALERT_BATCH_MAX_BYTES:
+                    deadline = min(
+                        self._alert_first_queued + self.ALERT_BATCH_MAX_DELAY,
+                        self._alert_last_queued + self.ALERT_BATCH_IDLE_DELAY
+                    )
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._alert_condition.wait(remaining)
+            
+            self._flush_custom_alerts()
+    
+    def _flush_custom_alerts(self):
+        """Deliver all queued alerts to the custom alert handler."""
+        with self._alert_condition:
+            if not self._alert_queue:
+                return
+            batch = list(self._alert_queue)
+            self._alert_queue.clear()
+            self._alert_queue_bytes = 0
+        
+        handler = self._custom_alert_handler
+        if not handler:
+            return
+        
+        try:
+            if self._custom_alert_handler_batched:
+                handler(batch)
+            else:
+                for alert_type, message, details in batch:
+                    handler(alert_type, message, details)
+        except Exception as e:
+            logger.error(f"Custom alert handler failed: {e}")
     
     def _send_email(self, subject: str, body: str):
         """Send an email alert."""
@@ -744,6 +925,10 @@ class ErrorDetector:
             logger.warning("SMTP credentials not configured, cannot send email alert")
             return
         
+        import smtplib
+        from email.mime.text import MIMEText
+        from email.mime.multipart import MIMEMultipart
+        
         # Create message
         message = MIMEMultipart()
         message["From"] = smtp_user
@@ -783,6 +968,8 @@ class ErrorDetector:
         if details:
             payload["details"] = details
         
+        import requests
+        
         try:
             response = requests.post(
                 self.alert_webhook,
@@ -806,7 +993,87 @@ class ErrorDetector:
         Returns:
             Dict containing comprehensive error statistics
         """
-        stats = {
+        stats = self._get_base_stats()
+        stats["error_patterns"] = dict(self.iter_pattern_stats())
+        
+        return stats
+    
+    def iter_pattern_stats(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Lazily compute statistics for each tracked error pattern.
+        
+        Yields:
+            Tuples of (pattern_key, pattern statistics)
+        """
+        hour_ago_ns = time.time_ns() - 3600 * NS_PER_SECOND
+        
+        # Fold count, first/last seen and hourly frequency into one pass per pattern
+        for pattern_key, timestamps in list(self.error_patterns.items()):
+            first_seen = last_seen = None
+            recent = 0
+            for t in timestamps:
+                if first_seen is None or t < first_seen:
+                    first_seen = t
+                if last_seen is None or t > last_seen:
+                    last_seen = t
+                if t > hour_ago_ns:
+                    recent += 1
+            
+            yield pattern_key, {
+                "count": len(timestamps),
+                "first_seen": _ns_to_datetime(first_seen).isoformat() if first_seen is not None else None,
+                "last_seen": _ns_to_datetime(last_seen).isoformat() if last_seen is not None else None,
+                "frequency_per_hour": recent
+            }
+    
+    def export_stats(self, file_path: str) -> bool:
+        """
+        Export detailed statistics to a JSON file.
+        
+        Pattern statistics are written one entry at a time, so the full
+        pattern dict is never built in memory.
+        
+        Args:
+            file_path: Path to save the statistics file
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        stats = self._get_base_stats()
+        stats["error_patterns"] = _StreamedMapping(self.iter_pattern_stats)
+        encoder = json.JSONEncoder(separators=(",", ":"))
+        
+        temp_path = None
+        try:
+            # Write next to the target and swap it in, so a failure part-way
+            # through never leaves a truncated file at file_path
+            fd, temp_path = tempfile.mkstemp(
+                dir=os.path.dirname(os.path.abspath(file_path)),
+                prefix=os.path.basename(file_path) + ".",
+                suffix=".tmp"
+            )
+            with os.fdopen(fd, "w") as f:
+                for chunk in encoder.iterencode(stats):
+                    f.write(chunk)
+            os.replace(temp_path, file_path)
+            temp_path = None
+            
+            logger.info(f"Exported statistics to {file_path}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to export statistics: {e}")
+            return False
+        finally:
+            if temp_path is not None:
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+    
+    def _get_base_stats(self) -> Dict[str, Any]:
+        """Get error counts, circuit breaker and recovery strategy statistics."""
+        return {
             "error_counts": dict(self.error_counts),
             "circuit_breaker": {
                 "is_open": self.circuit_breaker["is_open"],
@@ -824,27 +1091,18 @@ class ErrorDetector:
                     "fallback_endpoint": strategy.get("fallback_endpoint")
                 }
                 for code, strategy in self.recovery_strategies.items()
-            },
-            "error_patterns": {
-                pattern_key: {
-                    "count": len(timestamps),
-                    "first_seen": min(timestamps).isoformat() if timestamps else None,
-                    "last_seen": max(timestamps).isoformat() if timestamps else None,
-                    "frequency_per_hour": len([t for t in timestamps 
-                                             if (datetime.now() - t).total_seconds() < 3600])
-                }
-                for pattern_key, timestamps in self.error_patterns.items()
             }
         }
-        
-        return stats
     
-    def export_config(self, file_path: str) -> bool:
+    def export_config(self, file_path: str, pretty: bool = False) -> bool:
         """
         Export error detector configuration to a JSON file.
         
+        Paths ending in .gz are written gzip-compressed.
+        
         Args:
             file_path: Path to save the configuration file
+            pretty: Indent the output for readability (slower than compact encoding)
             
         Returns:
             bool: True if successful, False otherwise
@@ -870,8 +1128,15 @@ class ErrorDetector:
         }
         
         try:
-            with open(file_path, "w") as f:
-                json.dump(config, f, indent=2)
+            if orjson is not None:
+                with _open_config_file(file_path, "wb") as f:
+                    f.write(orjson.dumps(config, option=orjson.OPT_INDENT_2 if pretty else 0))
+            else:
+                with _open_config_file(file_path, "wt") as f:
+                    if pretty:
+                        json.dump(config, f, indent=2)
+                    else:
+                        json.dump(config, f, separators=(",", ":"))
             
             logger.info(f"Exported configuration to {file_path}")
             return True
@@ -884,6 +1149,8 @@ class ErrorDetector:
         """
         Import error detector configuration from a JSON file.
         
+        Paths ending in .gz are read as gzip-compressed.
+        
         Args:
             file_path: Path to the configuration file
             
@@ -891,36 +1158,28 @@ class ErrorDetector:
             bool: True if successful, False otherwise
         """
         try:
-            with open(file_path, "r") as f:
-                config = json.load(f)
+            with _open_config_file(file_path, "rb") as f:
+                data = f.read()
             
-            # Apply configuration
-            if "log_file" in config:
-                self.log_file = config["log_file"]
+            config = orjson.loads(data) if orjson is not None else json.loads(data)
             
-            if "alert_email" in config:
-                self.alert_email = config["alert_email"]
-                
-            if "alert_webhook" in config:
-                self.alert_webhook = config["alert_webhook"]
-                
-            if "circuit_breaker_threshold" in config:
-                self.CIRCUIT_BREAKER_THRESHOLD = config["circuit_breaker_threshold"]
-                
-            if "circuit_breaker_reset_timeout" in config:
-                self.circuit_breaker["reset_timeout"] = config["circuit_breaker_reset_timeout"]
-                
-            if "max_retries" in config:
-                self.MAX_RETRIES = config["max_retries"]
-                
-            if "retry_base_delay" in config:
-                self.RETRY_BASE_DELAY = config["retry_base_delay"]
+            # Apply configuration
+            for key, value in config.items():
+                setter = self._CONFIG_SETTERS.get(key)
+                if setter:
+                    setter(self, value)
+                elif key != "recovery_strategies":
+                    logger.warning(f"Ignoring unknown configuration key: {key}")
                 
             # Import recovery strategies
             if "recovery_strategies" in config:
                 for code, strategy_config in config["recovery_strategies"].items():
                     try:
-                        strategy = RecoveryStrategy(strategy_config["strategy"])
+                        strategy = self._STRATEGY_LOOKUP.get(strategy_config["strategy"])
+                        if strategy is None:
+                            logger.warning(f"Unknown recovery strategy for code {code}: {strategy_config['strategy']}")
+                            continue
+                        
                         self.add_recovery_strategy(
                             error_code=code,
                             strategy=strategy,
@@ -938,14 +1197,27 @@ class ErrorDetector:
             logger.error(f"Failed to import configuration: {e}")
             return False
             
-    def add_custom_alert_handler(self, handler: Callable[[str, str, Optional[Dict]], None]):
+    def add_custom_alert_handler(
+        self,
+        handler: Union[
+            Callable[[str, str, Optional[Dict]], None],
+            Callable[[List[Tuple[str, str, Optional[Dict]]]], None]
+        ],
+        batched: bool = False
+    ):
         """
         Add a custom alert handler function.
         
+        Alerts are queued and delivered from a background thread in batches
+        (after 100ms, 50ms of inactivity, or 64KiB of messages).
+        
         Args:
-            handler: Function that takes alert_type, message, and optional details
+            handler: Function that takes alert_type, message, and optional details,
+                or a list of such tuples when batched is True
+            batched: Pass each batch to the handler as a single list
         """
         self._custom_alert_handler = handler
+        self._custom_alert_handler_batched = batched
         logger.info("Custom alert handler added")
         
     def get_error_rates(self, interval_minutes: int = 60) -> Dict[str, Any]:
@@ -958,41 +1230,42 @@ class ErrorDetector:
         Returns:
             Dict containing error rates and trends
         """
-        now = datetime.now()
-        interval_start = now - timedelta(minutes=interval_minutes)
-        
-        # Filter recent errors
-        recent_errors = [
-            error for error in self.errors
-            if datetime.fromisoformat(error["timestamp"]) > interval_start
-        ]
-        
-        # Count errors by code
-        error_counts = defaultdict(int)
-        for error in recent_errors:
-            error_counts[error["error_code"]] += 1
+        now_ns = time.time_ns()
+        interval_ns = interval_minutes * 60 * NS_PER_SECOND
+        interval_start_ns = now_ns - interval_ns
+        previous_start_ns = interval_start_ns - interval_ns
+        
+        # Count errors by code id for the current and previous intervals
+        current_by_id = [0] * len(self._code_names)
+        previous_by_id = [0] * len(self._code_names)
+        for t, code_id in zip(self._error_times_ns, self._error_code_ids):
+            if t > interval_start_ns:
+                current_by_id[code_id] += 1
+            elif t > previous_start_ns:
+                previous_by_id[code_id] += 1
+        
+        error_counts = {
+            code: count
+            for code, count in zip(self._code_names, current_by_id) if count
+        }
+        previous_counts = {
+            code: count
+            for code, count in zip(self._code_names, previous_by_id) if count
+        }
             
-        # Calculate rates (errors per minute)
+        # Calculate rates (errors per minute); an empty interval has no rates,
+        # so interval_minutes=0 is never divided by
+        inv_interval = 1.0 / interval_minutes if error_counts else 0.0
         error_rates = {
-            code: count / interval_minutes
+            code: count * inv_interval
             for code, count in error_counts.items()
         }
         
         # Calculate trends (comparing to previous interval)
-        previous_start = interval_start - timedelta(minutes=interval_minutes)
-        previous_errors = [
-            error for error in self.errors
-            if previous_start < datetime.fromisoformat(error["timestamp"]) <= interval_start
-        ]
-        
-        previous_counts = defaultdict(int)
-        for error in previous_errors:
-            previous_counts[error["error_code"]] += 1
-            
         trends = {}
-        for code in set(list(error_counts.keys()) + list(previous_counts.keys())):
-            current = error_counts[code]
-            previous = previous_counts[code]
+        for code in error_counts.keys() | previous_counts.keys():
+            current = error_counts.get(code, 0)
+            previous = previous_counts.get(code, 0)
             
             if previous == 0:
                 if current == 0:
@@ -1000,20 +1273,21 @@ class ErrorDetector:
                 else:
                     trend = 100  # New error type
             else:
-                trend = ((current - previous) / previous) * 100  # Percentage change
+                # Percentage change rounded to 2 decimals using integer arithmetic
+                trend = ((current - previous) * 20000 + previous) // (2 * previous) / 100
                 
             trends[code] = {
                 "current_count": current,
                 "previous_count": previous,
-                "percent_change": round(trend, 2)
+                "percent_change": trend
             }
         
         return {
             "interval_minutes": interval_minutes,
-            "total_errors": len(recent_errors),
+            "total_errors": sum(current_by_id),
             "error_rates": error_rates,
             "trends": trends,
-            "timestamp": now.isoformat()
+            "timestamp": _ns_to_datetime(now_ns).isoformat()
         }
 
 
@@ -1087,8 +1361,7 @@ if __name__ == "__main__":
         
         # Wait for detection loop to run
         logger.info("Press Ctrl+C to stop...")
-        while True:
-            time.sleep(1)
+        threading.Event().wait()
             
     except KeyboardInterrupt:
         logger.info("Stopping error detection...")
@@ -8,18 +8,27 @@ including response times, success rates, and usage patterns.
 import os
 import time
 import json
+import heapq
+import atexit
+import queue
 import logging
+import tempfile
 import threading
-import statistics
-import smtplib
+import weakref
 import requests
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from datetime import date, datetime, timedelta
 from collections import deque, defaultdict
-import matplotlib.pyplot as plt
+from functools import lru_cache
+import numpy as np
 from typing import Dict, List, Optional, Union, Callable, Tuple, Any
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Fall back to the standard json module
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -31,6 +40,105 @@ logging.basicConfig(
 )
 logger = logging.getLogger("pyunto_monitor")
 
+# Queued to tell the alert worker to deliver what it has and exit
+_STOP_ALERT_WORKER = object()
+
+# Monitors to save and close at exit, held weakly so that an unused monitor
+# can still be garbage collected
+_live_monitors = weakref.WeakSet()
+
+
+@atexit.register
+def _close_live_monitors():
+    """Save a final snapshot for every monitor still alive at exit."""
+    for monitor in list(_live_monitors):
+        monitor._close_files()
+
+
+def _json_default(obj: Any) -> Any:
+    """Serialize deques and numpy arrays that the JSON encoders don't handle natively."""
+    if isinstance(obj, deque):
+        return list(obj)
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps_line(obj: Any) -> bytes:
+    """Serialize an object as a newline-terminated JSON line."""
+    if orjson is not None:
+        return orjson.dumps(
+            obj,
+            default=_json_default,
+            option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+    return (json.dumps(obj, default=_json_default) + "\n").encode("utf-8")
+
+
+def _loads_line(line: bytes) -> Any:
+    """Parse one JSON line written by _dumps_line."""
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+@lru_cache(maxsize=None)
+def _pyplot():
+    """Import pyplot on first use so plain request tracking never loads matplotlib."""
+    import matplotlib
+    matplotlib.use("Agg")  # Render to files only; no GUI backend needed
+    import matplotlib.pyplot as plt
+    return plt
+
+
+@lru_cache(maxsize=8)
+def _hour_keys(last_hour: datetime, count: int) -> Tuple[str, ...]:
+    """Usage keys for count consecutive hours ending with last_hour, oldest first."""
+    return tuple(
+        (last_hour - timedelta(hours=i)).strftime("%Y-%m-%d %H:00")
+        for i in range(count - 1, -1, -1)
+    )
+
+
+@lru_cache(maxsize=8)
+def _day_keys(last_day: date, count: int) -> Tuple[str, ...]:
+    """Usage keys for count consecutive days ending with last_day, oldest first."""
+    return tuple(
+        (last_day - timedelta(days=i)).strftime("%Y-%m-%d")
+        for i in range(count - 1, -1, -1)
+    )
+
+
+def _read_last_line(file_path: str, block_size: int = 64 * 1024) -> Optional[bytes]:
+    """
+    Read the last non-empty line of a file by seeking back from the end.
+    
+    The read window starts at block_size and doubles until it holds a
+    complete line, so only the tail of the file is read.
+    
+    Args:
+        file_path: Path to the file
+        block_size: Initial number of bytes to read from the end
+        
+    Returns:
+        The last line without its newline, or None if the file is empty
+    """
+    with open(file_path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        window = block_size
+        
+        while True:
+            start = max(0, size - window)
+            f.seek(start)
+            lines = f.read(size - start).rstrip().rsplit(b"\n", 1)
+            
+            if len(lines) == 2 or start == 0:
+                return lines[-1].strip() or None
+            
+            window *= 2
+
+
 class PyuntoMonitor:
     """Pyunto Intelligence API performance monitor."""
     
@@ -41,7 +149,8 @@ class PyuntoMonitor:
         alert_email: Optional[str] = None,
         alert_webhook: Optional[str] = None,
         metrics_file: str = "pyunto_metrics.jsonl",
-        enable_visualization: bool = True
+        enable_visualization: bool = True,
+        events_file: str = "pyunto_events.jsonl"
     ):
         """
         Initialize the monitor.
@@ -51,28 +160,61 @@ class PyuntoMonitor:
             api_url: Base URL for the API
             alert_email: Email address for alerts (optional)
             alert_webhook: Webhook URL for alerts (optional)
-            metrics_file: File to store metrics data
+            metrics_file: File holding the latest metrics snapshot (rewritten hourly and on stop)
             enable_visualization: Whether to enable visualization features
+            events_file: File to append per-request events to
         """
         self.api_key = api_key
         self.api_url = api_url
         self.alert_email = alert_email
         self.alert_webhook = alert_webhook
         self.metrics_file = metrics_file
+        self.events_file = events_file
         self.enable_visualization = enable_visualization
         
         # Performance metrics
-        self.response_times = deque(maxlen=1000)  # Last 1000 response times
+        self._rt_buf = np.empty(1000, dtype=np.float64)  # Ring buffer of the last 1000 response times
+        self._rt_head = 0  # Next write position in the ring buffer
+        self._rt_count = 0  # Number of valid samples in the ring buffer
         self.error_rates = deque(maxlen=100)  # Last 100 error rate measurements
         self.usage_by_hour = defaultdict(int)  # Usage count by hour
         self.usage_by_day = defaultdict(int)  # Usage count by day
-        self.status_codes = defaultdict(int)  # Count of status codes
+        self._status_counts = np.zeros(1000, dtype=np.int64)  # Count per status code (0-999)
+        self._other_status_codes = defaultdict(int)  # Counts for codes outside 0-999
+        self._total_requests = 0  # Running total of tracked requests
+        self._error_requests = 0  # Running total of 4xx/5xx requests
+        self.hour_retention_days = 2  # How long hourly usage is kept
+        self.day_retention_days = 90  # How long daily usage is kept
+        
+        # Usage keys for the current hour, reused until the next hour starts
+        self._hour_key = None
+        self._day_key = None
+        self._hour_key_expires = 0.0
+        
+        # Rolling 7-day usage total, recomputed when the date changes
+        self._last7_date = None
+        self._last7_sum = 0
+        
+        # Guards metric state shared by request, monitoring and reporting threads
+        self._lock = threading.Lock()
         
         # Alert thresholds
         self.response_time_threshold_ms = 2000  # Default: 2 seconds
         self.error_rate_threshold = 0.1  # Default: 10%
         self.quota_warning_threshold = 0.8  # Default: 80% of quota
         
+        # Keep-alive HTTP session for health and quota checks
+        self._http = requests.Session()
+        self._http.headers.update({
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        })
+        self._http.mount("https://", HTTPAdapter(
+            pool_connections=2,
+            pool_maxsize=2,
+            max_retries=Retry(total=2, backoff_factor=0.2)
+        ))
+        
         # Monitoring state
         self.monitoring_active = False
         self.monitor_thread = None
@@ -81,15 +223,23 @@ class PyuntoMonitor:
         # Load existing metrics if available
         self._load_metrics()
         
-        # Last alert timestamps to prevent alert storms
-        self.last_alerts = {
-            "response_time": datetime.min,
-            "error_rate": datetime.min,
-            "quota": datetime.min
-        }
+        # Per-request events are appended through a buffered handle; the full
+        # snapshot is rewritten hourly (on the first request of each hour and
+        # by the monitoring loop) and when the process stops
+        self._events_fh = open(self.events_file, "ab", buffering=64 * 1024)
+        self._last_snapshot_hour = None
+        _live_monitors.add(self)
+        
+        # Last sent time (epoch seconds) per (alert type, endpoint) to prevent alert storms
+        self._alert_cache = {}
         
         # Alert cooldown period (in hours)
         self.alert_cooldown_hours = 2
+        
+        # Alerts are delivered by a worker thread so tracking never waits on SMTP/HTTP
+        self._alert_queue = queue.Queue(maxsize=100)
+        self._alert_worker = None
+        self.alert_batch_window_seconds = 1.0
     
     def setup_basic_monitoring(
         self,
@@ -132,19 +282,22 @@ class PyuntoMonitor:
         logger.info("Pyunto Intelligence monitoring started")
     
     def stop(self):
-        """Stop the monitoring process."""
-        if not self.monitoring_active:
+        """Stop the monitoring process and save the current metrics."""
+        if self.monitoring_active:
+            self.monitoring_active = False
+            if self.monitor_thread:
+                self.monitor_thread.join(timeout=60)
+            logger.info("Pyunto Intelligence monitoring stopped")
+        else:
             logger.warning("Monitoring is not active")
-            return
         
-        self.monitoring_active = False
-        if self.monitor_thread:
-            self.monitor_thread.join(timeout=60)
+        # Deliver queued alerts before the session they use is closed
+        self._stop_alert_worker()
         
-        # Save metrics before stopping
+        # Save metrics even if only track_request was used
         self._save_metrics()
-        
-        logger.info("Pyunto Intelligence monitoring stopped")
+        self._flush_events()
+        self._http.close()
     
     def track_request(
         self,
@@ -162,37 +315,90 @@ class PyuntoMonitor:
             status_code: HTTP status code
             request_data: Optional request data for context
         """
-        timestamp = datetime.now()
-        
-        # Record response time
-        self.response_times.append(response_time_ms)
-        
-        # Record status code
-        self.status_codes[status_code] += 1
-        
-        # Record usage by time
-        hour_key = timestamp.strftime("%Y-%m-%d %H:00")
-        day_key = timestamp.strftime("%Y-%m-%d")
-        self.usage_by_hour[hour_key] += 1
-        self.usage_by_day[day_key] += 1
-        
-        # Calculate current error rate (last 100 requests)
-        total_requests = sum(self.status_codes.values())
-        error_requests = sum(self.status_codes.get(code, 0) for code in range(400, 600))
-        
-        if total_requests > 0:
-            current_error_rate = error_requests / total_requests
+        ts = time.time()
+        save_snapshot = False
+        
+        with self._lock:
+            # Record response time
+            self._rt_buf[self._rt_head] = response_time_ms
+            self._rt_head = (self._rt_head + 1) % self._rt_buf.size
+            if self._rt_count < self._rt_buf.size:
+                self._rt_count += 1
+            
+            # Record status code
+            if 0 <= status_code < 1000:
+                self._status_counts[status_code] += 1
+            else:
+                self._other_status_codes[status_code] += 1
+            self._total_requests += 1
+            if 400 <= status_code < 600:
+                self._error_requests += 1
+            
+            # Record usage by time (keys are only reformatted when the hour changes)
+            if ts >= self._hour_key_expires:
+                # A new hour has started; snapshot once the lock is released
+                save_snapshot = self._hour_key is not None
+                self._update_usage_keys(ts)
+            self.usage_by_hour[self._hour_key] += 1
+            self.usage_by_day[self._day_key] += 1
+            if self._day_key == self._last7_date:
+                self._last7_sum += 1
+            
+            # Calculate current error rate
+            current_error_rate = self._error_requests / self._total_requests
             self.error_rates.append(current_error_rate)
         
         # Check for concerning metrics
         self._check_alerts(response_time_ms, current_error_rate, endpoint)
         
-        # Save metrics periodically (every 100 requests)
-        if total_requests % 100 == 0:
+        # Save the hourly snapshot here too, so embedders that never call
+        # start() still persist their metrics
+        if save_snapshot:
             self._save_metrics()
         
+        # Append the request event
+        try:
+            self._events_fh.write(_dumps_line({
+                "timestamp": ts,
+                "endpoint": endpoint,
+                "response_time_ms": response_time_ms,
+                "status_code": status_code
+            }))
+        except Exception as e:
+            logger.error(f"Failed to write request event: {e}")
+        
         logger.debug(f"Tracked request to {endpoint}: {status_code}, {response_time_ms}ms")
     
+    @property
+    def response_times(self) -> np.ndarray:
+        """Recent response times in milliseconds, oldest first."""
+        with self._lock:
+            if self._rt_count < self._rt_buf.size:
+                return self._rt_buf[:self._rt_count].copy()
+            return np.concatenate((self._rt_buf[self._rt_head:], self._rt_buf[:self._rt_head]))
+    
+    @property
+    def status_codes(self) -> Dict[int, int]:
+        """Request count per HTTP status code."""
+        with self._lock:
+            return self._status_code_counts()
+    
+    def _status_code_counts(self) -> Dict[int, int]:
+        """Build the status code -> count dict; the caller must hold the lock."""
+        codes = np.flatnonzero(self._status_counts)
+        counts = {int(code): int(count) for code, count in zip(codes, self._status_counts[codes])}
+        counts.update(self._other_status_codes)
+        return counts
+    
+    def _update_usage_keys(self, ts: float):
+        """Format the hour and day usage keys for a timestamp and cache them until the next hour."""
+        timestamp = datetime.fromtimestamp(ts)
+        hour_start = timestamp.replace(minute=0, second=0, microsecond=0)
+        
+        self._hour_key = timestamp.strftime("%Y-%m-%d %H:00")
+        self._day_key = timestamp.strftime("%Y-%m-%d")
+        self._hour_key_expires = (hour_start + timedelta(hours=1)).timestamp()
+    
     def health_check(self) -> Tuple[bool, Dict[str, Any]]:
         """
         Perform a health check of the Pyunto Intelligence API.
@@ -200,17 +406,11 @@ class PyuntoMonitor:
         Returns:
             Tuple of (is_healthy, metrics)
         """
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
         try:
             # Make a simple health check request
             start_time = time.time()
-            response = requests.get(
+            response = self._http.get(
                 f"{self.api_url}/health",
-                headers=headers,
                 timeout=10
             )
             end_time = time.time()
@@ -228,9 +428,8 @@ class PyuntoMonitor:
             # Get quota information if available
             quota_info = {}
             try:
-                quota_response = requests.get(
+                quota_response = self._http.get(
                     f"{self.api_url}/quota",
-                    headers=headers,
                     timeout=10
                 )
                 if quota_response.status_code == 200:
@@ -273,39 +472,62 @@ class PyuntoMonitor:
         Returns:
             Dict containing performance metrics
         """
-        # Calculate response time statistics
-        response_times = list(self.response_times)
+        now = datetime.now()
+        today = now.strftime("%Y-%m-%d")
+        yesterday = (now - timedelta(days=1)).strftime("%Y-%m-%d")
         
-        if response_times:
-            avg_response_time = statistics.mean(response_times)
-            median_response_time = statistics.median(response_times)
-            p95_response_time = sorted(response_times)[int(len(response_times) * 0.95)]
+        # Take a consistent copy of the shared state, then compute outside the lock
+        with self._lock:
+            # Order does not matter here, so copy the filled part of the ring buffer as is
+            response_times = self._rt_buf[:self._rt_count].copy()
+            total_requests = self._total_requests
+            error_requests = self._error_requests
+            status_codes = self._status_code_counts()
+            
+            today_usage = self.usage_by_day.get(today, 0)
+            yesterday_usage = self.usage_by_day.get(yesterday, 0)
+            
+            # Recompute the 7-day window once per day; track_request keeps it current
+            if today != self._last7_date:
+                self._last7_date = today
+                self._last7_sum = sum(
+                    self.usage_by_day.get(
+                        (now - timedelta(days=i)).strftime("%Y-%m-%d"),
+                        0
+                    ) for i in range(7)
+                )
+            last_7_days_usage = self._last7_sum
+        
+        # Calculate response time statistics
+        if response_times.size:
+            avg_response_time = float(response_times.mean())
+            
+            # Select the median and 95th percentile in one partition pass
+            # instead of sorting the whole array
+            size = response_times.size
+            mid = size // 2
+            p95_index = int(size * 0.95)
+            response_times.partition(sorted({max(mid - 1, 0), mid, p95_index}))
+            if size % 2:
+                median_response_time = float(response_times[mid])
+            else:
+                median_response_time = float(response_times[mid - 1] + response_times[mid]) / 2
+            p95_response_time = float(response_times[p95_index])
         else:
             avg_response_time = median_response_time = p95_response_time = 0
         
         # Calculate error rate
-        total_requests = sum(self.status_codes.values())
-        error_requests = sum(self.status_codes.get(code, 0) for code in range(400, 600))
-        
         if total_requests > 0:
             current_error_rate = error_requests / total_requests
         else:
             current_error_rate = 0
         
-        # Get recent usage
-        now = datetime.now()
-        today = now.strftime("%Y-%m-%d")
-        yesterday = (now - timedelta(days=1)).strftime("%Y-%m-%d")
-        
-        today_usage = self.usage_by_day.get(today, 0)
-        yesterday_usage = self.usage_by_day.get(yesterday, 0)
-        
         return {
             "response_time": {
                 "average_ms": round(avg_response_time, 2),
                 "median_ms": round(median_response_time, 2),
                 "p95_ms": round(p95_response_time, 2),
-                "samples": len(response_times)
+                "samples": int(response_times.size)
             },
             "error_rate": {
                 "current": round(current_error_rate * 100, 2),
@@ -315,14 +537,9 @@ class PyuntoMonitor:
             "usage": {
                 "today": today_usage,
                 "yesterday": yesterday_usage,
-                "last_7_days": sum(
-                    self.usage_by_day.get(
-                        (now - timedelta(days=i)).strftime("%Y-%m-%d"), 
-                        0
-                    ) for i in range(7)
-                )
+                "last_7_days": last_7_days_usage
             },
-            "status_codes": dict(self.status_codes),
+            "status_codes": status_codes,
             "timestamp": datetime.now().isoformat()
         }
     
@@ -339,81 +556,77 @@ class PyuntoMonitor:
         
         os.makedirs(output_dir, exist_ok=True)
         
+        response_times = self.response_times
+        with self._lock:
+            error_rates = list(self.error_rates)
+            status_codes = self._status_code_counts()
+        
+        plt = _pyplot()
+        
+        # Draw every chart on one figure so the backend is set up once
+        fig, axes = plt.subplots(3, 2, figsize=(14, 18))
+        (rt_ax, er_ax), (hour_ax, day_ax), (status_ax, unused_ax) = axes
+        unused_ax.axis("off")
+        
         # Response time over time
-        if self.response_times:
-            plt.figure(figsize=(12, 6))
-            plt.plot(list(self.response_times))
-            plt.title("Response Time (ms)")
-            plt.xlabel("Request #")
-            plt.ylabel("Response Time (ms)")
-            plt.axhline(y=self.response_time_threshold_ms, color='r', linestyle='--')
-            plt.grid(True)
-            plt.savefig(os.path.join(output_dir, "response_times.png"))
-            plt.close()
+        if response_times.size:
+            rt_ax.plot(response_times)
+            rt_ax.axhline(y=self.response_time_threshold_ms, color='r', linestyle='--')
+        rt_ax.set_title("Response Time (ms)")
+        rt_ax.set_xlabel("Request #")
+        rt_ax.set_ylabel("Response Time (ms)")
+        rt_ax.grid(True)
         
         # Error rate over time
-        if self.error_rates:
-            plt.figure(figsize=(12, 6))
-            plt.plot([rate * 100 for rate in self.error_rates])
-            plt.title("Error Rate (%)")
-            plt.xlabel("Measurement #")
-            plt.ylabel("Error Rate (%)")
-            plt.axhline(y=self.error_rate_threshold * 100, color='r', linestyle='--')
-            plt.grid(True)
-            plt.savefig(os.path.join(output_dir, "error_rates.png"))
-            plt.close()
-        
-        # Usage by hour (last 24 hours)
+        if error_rates:
+            er_ax.plot([rate * 100 for rate in error_rates])
+            er_ax.axhline(y=self.error_rate_threshold * 100, color='r', linestyle='--')
+        er_ax.set_title("Error Rate (%)")
+        er_ax.set_xlabel("Measurement #")
+        er_ax.set_ylabel("Error Rate (%)")
+        er_ax.grid(True)
+        
+        # Usage by hour (last 24 hours); key lists are cached until the hour changes
         now = datetime.now()
-        hour_keys = [
-            (now - timedelta(hours=i)).strftime("%Y-%m-%d %H:00")
-            for i in range(24, 0, -1)
-        ]
+        current_hour = now.replace(minute=0, second=0, microsecond=0)
+        hour_keys = _hour_keys(current_hour - timedelta(hours=1), 24)
         
         hour_values = [self.usage_by_hour.get(key, 0) for key in hour_keys]
         
-        plt.figure(figsize=(14, 6))
-        plt.bar(range(len(hour_keys)), hour_values)
-        plt.title("API Usage by Hour (Last 24 Hours)")
-        plt.xlabel("Hour")
-        plt.ylabel("Request Count")
-        plt.xticks(range(len(hour_keys)), [key.split()[1] for key in hour_keys], rotation=45)
-        plt.tight_layout()
-        plt.savefig(os.path.join(output_dir, "usage_by_hour.png"))
-        plt.close()
+        hour_ax.bar(range(len(hour_keys)), hour_values)
+        hour_ax.set_title("API Usage by Hour (Last 24 Hours)")
+        hour_ax.set_xlabel("Hour")
+        hour_ax.set_ylabel("Request Count")
+        hour_ax.set_xticks(range(len(hour_keys)))
+        hour_ax.set_xticklabels([key.split()[1] for key in hour_keys], rotation=45)
         
         # Usage by day (last 30 days)
-        day_keys = [
-            (now - timedelta(days=i)).strftime("%Y-%m-%d")
-            for i in range(30, 0, -1)
-        ]
+        day_keys = _day_keys(now.date() - timedelta(days=1), 30)
         
         day_values = [self.usage_by_day.get(key, 0) for key in day_keys]
         
-        plt.figure(figsize=(14, 6))
-        plt.bar(range(len(day_keys)), day_values)
-        plt.title("API Usage by Day (Last 30 Days)")
-        plt.xlabel("Day")
-        plt.ylabel("Request Count")
-        plt.xticks(range(len(day_keys)), [key[5:] for key in day_keys], rotation=45)
-        plt.tight_layout()
-        plt.savefig(os.path.join(output_dir, "usage_by_day.png"))
-        plt.close()
+        day_ax.bar(range(len(day_keys)), day_values)
+        day_ax.set_title("API Usage by Day (Last 30 Days)")
+        day_ax.set_xlabel("Day")
+        day_ax.set_ylabel("Request Count")
+        day_ax.set_xticks(range(len(day_keys)))
+        day_ax.set_xticklabels([key[5:] for key in day_keys], rotation=45)
         
         # Status code distribution
-        if self.status_codes:
-            labels = list(self.status_codes.keys())
-            values = list(self.status_codes.values())
-            
-            plt.figure(figsize=(10, 6))
-            plt.bar(range(len(labels)), values)
-            plt.title("Status Code Distribution")
-            plt.xlabel("Status Code")
-            plt.ylabel("Count")
-            plt.xticks(range(len(labels)), labels)
-            plt.tight_layout()
-            plt.savefig(os.path.join(output_dir, "status_codes.png"))
-            plt.close()
+        if status_codes:
+            labels = list(status_codes.keys())
+            values = list(status_codes.values())
+            
+            status_ax.bar(range(len(labels)), values)
+            status_ax.set_xticks(range(len(labels)))
+            status_ax.set_xticklabels(labels)
+        status_ax.set_title("Status Code Distribution")
+        status_ax.set_xlabel("Status Code")
+        status_ax.set_ylabel("Count")
+        
+        fig.tight_layout()
+        fig.savefig(os.path.join(output_dir, "dashboard.png"))
+        plt.close(fig)
         
         logger.info(f"Visualizations saved to {output_dir}")
     
@@ -434,8 +647,18 @@ class PyuntoMonitor:
                 if 'quota_info' in metrics and metrics['quota_info']:
                     self._check_quota_alerts(metrics['quota_info'])
                 
+                now = datetime.now()
+                
+                # Save a full metrics snapshot once per hour
+                snapshot_hour = now.strftime("%Y-%m-%d %H")
+                if snapshot_hour != self._last_snapshot_hour:
+                    self._last_snapshot_hour = snapshot_hour
+                    self._prune_usage(now)
+                    self._save_metrics()
+                    self._prune_alert_cache()
+                
                 # Generate periodic report (daily)
-                current_hour = datetime.now().hour
+                current_hour = now.hour
                 if current_hour == 0:  # Midnight
                     self._generate_daily_report()
                 
@@ -452,13 +675,10 @@ class PyuntoMonitor:
         endpoint: str
     ):
         """Check if any metrics trigger alerts."""
-        now = datetime.now()
-        
-        # Check response time alert
+        # Check response time alert (deduplicated per endpoint)
         if (response_time_ms > self.response_time_threshold_ms and
-            (now - self.last_alerts["response_time"]).total_seconds() > self.alert_cooldown_hours * 3600):
+            self._should_send_alert("response_time", endpoint)):
             
-            self.last_alerts["response_time"] = now
             message = (f"ALERT: High response time detected ({response_time_ms:.2f}ms) "
                       f"for endpoint {endpoint}. Threshold: {self.response_time_threshold_ms}ms")
             
@@ -467,19 +687,60 @@ class PyuntoMonitor:
         
         # Check error rate alert
         if (error_rate > self.error_rate_threshold and
-            (now - self.last_alerts["error_rate"]).total_seconds() > self.alert_cooldown_hours * 3600):
+            self._should_send_alert("error_rate")):
             
-            self.last_alerts["error_rate"] = now
             message = (f"ALERT: High error rate detected ({error_rate:.2%}). "
                       f"Threshold: {self.error_rate_threshold:.2%}")
             
             logger.warning(message)
             self._send_alert("High Error Rate", message)
     
+    def _should_send_alert(self, alert_type: str, endpoint: Optional[str] = None) -> bool:
+        """
+        Check the alert cache and record the alert if it is not in cooldown.
+        
+        Returns:
+            bool: True if the alert should be sent, False if it is a duplicate
+        """
+        key = (alert_type, endpoint)
+        now = time.time()
+        
+        with self._lock:
+            last_sent = self._alert_cache.get(key)
+            if last_sent is not None and now - last_sent < self.alert_cooldown_hours * 3600:
+                return False
+            
+            self._alert_cache[key] = now
+            return True
+    
+    def _prune_alert_cache(self):
+        """Drop alert cache entries whose cooldown has expired."""
+        cutoff = time.time() - self.alert_cooldown_hours * 3600
+        
+        with self._lock:
+            self._alert_cache = {
+                key: last_sent for key, last_sent in self._alert_cache.items()
+                if last_sent >= cutoff
+            }
+    
+    def _prune_usage(self, now: datetime):
+        """Drop hourly and daily usage entries older than their retention periods."""
+        cutoff_hour = (now - timedelta(days=self.hour_retention_days)).strftime("%Y-%m-%d %H:00")
+        cutoff_day = (now - timedelta(days=self.day_retention_days)).strftime("%Y-%m-%d")
+        
+        # Keys are zero-padded timestamps, so string order matches time order
+        with self._lock:
+            self.usage_by_hour = defaultdict(int, {
+                key: count for key, count in self.usage_by_hour.items()
+                if key >= cutoff_hour
+            })
+            self.usage_by_day = defaultdict(int, {
+                key: count for key, count in self.usage_by_day.items()
+                if key >= cutoff_day
+            })
+    
     def _check_quota_alerts(self, quota_info: Dict[str, Any]):
         """Check if quota usage triggers alerts."""
-        now = datetime.now()
-        
         # Check for quota alert
         if 'used' in quota_info and 'limit' in quota_info:
             used = quota_info['used']
@@ -489,9 +750,8 @@ class PyuntoMonitor:
                 usage_ratio = used / limit
                 
                 if (usage_ratio > self.quota_warning_threshold and
-                    (now - self.last_alerts["quota"]).total_seconds() > self.alert_cooldown_hours * 3600):
+                    self._should_send_alert("quota")):
                     
-                    self.last_alerts["quota"] = now
                     message = (f"ALERT: Approaching API quota limit. "
                               f"Used: {used}/{limit} ({usage_ratio:.2%}). "
                               f"Threshold: {self.quota_warning_threshold:.2%}")
@@ -501,6 +761,7 @@ class PyuntoMonitor:
     
     def _generate_daily_report(self):
         """Generate and send a daily report."""
+        self._flush_events()
         summary = self.get_performance_summary()
         
         # Generate report text
@@ -538,13 +799,76 @@ class PyuntoMonitor:
         logger.info("Daily report generated and sent")
     
     def _send_alert(self, alert_type: str, message: str):
-        """Send an alert via configured channels."""
-        if self.alert_email:
-            subject = f"Pyunto Intelligence Alert: {alert_type}"
-            self._send_email(subject, message)
+        """Queue an alert for delivery via configured channels."""
+        if not self.alert_email and not self.alert_webhook:
+            return
+        
+        with self._lock:
+            if self._alert_worker is None:
+                self._alert_worker = threading.Thread(target=self._alert_worker_loop)
+                self._alert_worker.daemon = True
+                self._alert_worker.start()
+        
+        try:
+            self._alert_queue.put_nowait((alert_type, message))
+        except queue.Full:
+            logger.warning(f"Alert queue is full, dropping alert: {alert_type}")
+    
+    def _stop_alert_worker(self):
+        """Have the alert worker deliver the alerts still queued, and wait for it to exit."""
+        with self._lock:
+            worker = self._alert_worker
+            self._alert_worker = None
+        if worker is None:
+            return
         
-        if self.alert_webhook:
-            self._send_webhook(alert_type, message)
+        try:
+            self._alert_queue.put(_STOP_ALERT_WORKER, timeout=10)
+        except queue.Full:
+            logger.warning("Alert queue is full, alert worker could not be stopped")
+            return
+        worker.join(timeout=60)
+        if worker.is_alive():
+            logger.warning("Alert worker did not finish delivering alerts")
+    
+    def _alert_worker_loop(self):
+        """Deliver queued alerts, batching those that arrive within a short window."""
+        stopping = False
+        while not stopping:
+            item = self._alert_queue.get()
+            if item is _STOP_ALERT_WORKER:
+                break
+            alerts = [item]
+            
+            # Collect any further alerts that arrive within the batch window
+            deadline = time.monotonic() + self.alert_batch_window_seconds
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._alert_queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP_ALERT_WORKER:
+                    # Deliver this last batch, then exit
+                    stopping = True
+                    break
+                alerts.append(item)
+            
+            try:
+                if self.alert_email:
+                    self._send_emails([
+                        (f"Pyunto Intelligence Alert: {alert_type}", message)
+                        for alert_type, message in alerts
+                    ])
+                
+                if self.alert_webhook:
+                    for alert_type, message in alerts:
+                        self._send_webhook(alert_type, message)
+                        
+            except Exception as e:
+                logger.error(f"Failed to deliver alerts: {e}")
     
     def _send_email(self, subject: str, body: str):
         """Send an email alert.
@@ -553,6 +877,14 @@ class PyuntoMonitor:
             subject: Email subject
             body: Email body
         """
+        self._send_emails([(subject, body)])
+    
+    def _send_emails(self, emails: List[Tuple[str, str]]):
+        """Send email alerts over a single SMTP connection.
+        
+        Args:
+            emails: List of (subject, body) tuples
+        """
         if not self.alert_email:
             logger.warning("No alert email configured")
             return
@@ -570,14 +902,9 @@ class PyuntoMonitor:
         sender_email = smtp_user
         receiver_email = self.alert_email
         
-        # Create message
-        message = MIMEMultipart()
-        message["From"] = sender_email
-        message["To"] = receiver_email
-        message["Subject"] = subject
-        
-        # Attach body
-        message.attach(MIMEText(body, "plain"))
+        import smtplib
+        from email.mime.text import MIMEText
+        from email.mime.multipart import MIMEMultipart
         
         try:
             # Connect to SMTP server
@@ -585,11 +912,22 @@ class PyuntoMonitor:
             server.starttls()
             server.login(smtp_user, smtp_pass)
             
-            # Send email
-            server.sendmail(sender_email, receiver_email, message.as_string())
+            for subject, body in emails:
+                # Create message
+                message = MIMEMultipart()
+                message["From"] = sender_email
+                message["To"] = receiver_email
+                message["Subject"] = subject
+                
+                # Attach body
+                message.attach(MIMEText(body, "plain"))
+                
+                # Send email
+                server.send_message(message)
+            
             server.quit()
             
-            logger.info(f"Alert email sent to {receiver_email}")
+            logger.info(f"{len(emails)} alert email(s) sent to {receiver_email}")
             
         except Exception as e:
             logger.error(f"Failed to send alert email: {e}")
@@ -615,7 +953,7 @@ class PyuntoMonitor:
         try:
             response = requests.post(
                 self.alert_webhook,
-                json=payload,
+                data=_dumps_line(payload),
                 headers={"Content-Type": "application/json"},
                 timeout=10
             )
@@ -629,51 +967,98 @@ class PyuntoMonitor:
             logger.error(f"Failed to send webhook alert: {e}")
     
     def _save_metrics(self):
-        """Save current metrics to file."""
+        """Overwrite the metrics file with a snapshot of the current metrics."""
+        temp_path = None
         try:
-            # Create metrics object
-            metrics = {
-                "timestamp": datetime.now().isoformat(),
-                "response_times": list(self.response_times),
-                "error_rates": list(self.error_rates),
-                "usage_by_hour": dict(self.usage_by_hour),
-                "usage_by_day": dict(self.usage_by_day),
-                "status_codes": dict(self.status_codes)
-            }
+            response_times = self.response_times
             
-            # Save to file (append mode)
-            with open(self.metrics_file, "a") as f:
-                f.write(json.dumps(metrics) + "\n")
+            # Serialize the live containers under the lock instead of copying them first
+            with self._lock:
+                line = _dumps_line({
+                    "timestamp": datetime.now().isoformat(),
+                    "response_times": response_times,
+                    "error_rates": self.error_rates,
+                    "usage_by_hour": self.usage_by_hour,
+                    "usage_by_day": self.usage_by_day,
+                    "status_codes": self._status_code_counts()
+                })
+            
+            # Write a temporary file next to the snapshot and swap it in, so
+            # the file holds exactly one complete snapshot at any time
+            fd, temp_path = tempfile.mkstemp(
+                dir=os.path.dirname(os.path.abspath(self.metrics_file)),
+                prefix=os.path.basename(self.metrics_file) + ".",
+                suffix=".tmp"
+            )
+            with os.fdopen(fd, "wb") as f:
+                f.write(line)
+            os.replace(temp_path, self.metrics_file)
+            temp_path = None
                 
             logger.debug("Metrics saved to file")
             
         except Exception as e:
             logger.error(f"Failed to save metrics: {e}")
+        finally:
+            if temp_path is not None:
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+    
+    def _flush_events(self):
+        """Flush buffered request events to the events file."""
+        try:
+            self._events_fh.flush()
+        except Exception as e:
+            logger.error(f"Failed to flush request events: {e}")
+    
+    def _close_files(self):
+        """Deliver queued alerts, save a final metrics snapshot and close the events file (runs at exit)."""
+        self._stop_alert_worker()
+        if not self._events_fh.closed:
+            self._save_metrics()
+        try:
+            if not self._events_fh.closed:
+                self._events_fh.close()
+        except Exception as e:
+            logger.error(f"Failed to close {self._events_fh.name}: {e}")
     
     def _load_metrics(self):
         """Load metrics from file if it exists."""
-        if not os.path.exists(self.metrics_file):
-            logger.info(f"No metrics file found at {self.metrics_file}")
-            return
-        
         try:
-            with open(self.metrics_file, "r") as f:
-                # Read the last line (most recent metrics)
-                lines = f.readlines()
-                if not lines:
-                    return
-                
-                latest_metrics = json.loads(lines[-1])
-                
-                # Restore metrics
-                self.response_times = deque(latest_metrics["response_times"], maxlen=1000)
-                self.error_rates = deque(latest_metrics["error_rates"], maxlen=100)
-                self.usage_by_hour = defaultdict(int, latest_metrics["usage_by_hour"])
-                self.usage_by_day = defaultdict(int, latest_metrics["usage_by_day"])
-                self.status_codes = defaultdict(int, latest_metrics["status_codes"])
-                
-                logger.info(f"Loaded metrics from {self.metrics_file}")
-                
+            # The snapshot is a single line; files from older versions hold one
+            # snapshot per line, so read only the last (most recent) one
+            try:
+                last_line = _read_last_line(self.metrics_file)
+            except FileNotFoundError:
+                logger.info(f"No metrics file found at {self.metrics_file}")
+                return
+            if not last_line:
+                return
+            
+            latest_metrics = _loads_line(last_line)
+            
+            # Restore metrics
+            recent_times = latest_metrics["response_times"][-self._rt_buf.size:]
+            self._rt_buf[:len(recent_times)] = recent_times
+            self._rt_count = len(recent_times)
+            self._rt_head = self._rt_count % self._rt_buf.size
+            self.error_rates = deque(latest_metrics["error_rates"], maxlen=100)
+            self.usage_by_hour = defaultdict(int, latest_metrics["usage_by_hour"])
+            self.usage_by_day = defaultdict(int, latest_metrics["usage_by_day"])
+            # JSON object keys are strings; restore integer status codes
+            for code, count in latest_metrics["status_codes"].items():
+                code = int(code)
+                if 0 <= code < 1000:
+                    self._status_counts[code] = count
+                else:
+                    self._other_status_codes[code] = count
+            self._total_requests = int(self._status_counts.sum()) + sum(self._other_status_codes.values())
+            self._error_requests = int(self._status_counts[400:600].sum())
+            
+            logger.info(f"Loaded metrics from {self.metrics_file}")
+            
         except Exception as e:
             logger.error(f"Failed to load metrics: {e}")
 
@@ -712,6 +1097,15 @@ class UsageTracker:
         self.usage_by_endpoint = defaultdict(int)
         self.usage_by_assistant = defaultdict(int)
         
+        # Usage keys for the current hour, reused until the next hour starts
+        self._hour_key = None
+        self._day_key = None
+        self._hour_key_expires = 0.0
+        
+        # Rolling 30-day usage total, recomputed when the date changes
+        self._last30_date = None
+        self._last30_sum = 0
+        
         # Load existing usage data if available
         self._load_usage_data()
     
@@ -729,7 +1123,7 @@ class UsageTracker:
             assistant_id: Optional assistant ID
             status_code: HTTP status code
         """
-        timestamp = datetime.now()
+        ts = time.time()
         
         # Skip non-billable calls (e.g., health checks)
         if endpoint.endswith("/health") or endpoint.endswith("/quota"):
@@ -738,12 +1132,16 @@ class UsageTracker:
         # Update usage counters
         self.current_month_usage += 1
         
-        day_key = timestamp.strftime("%Y-%m-%d")
-        hour_key = timestamp.strftime("%Y-%m-%d %H:00")
+        if ts >= self._hour_key_expires:
+            self._update_usage_keys(ts)
+        day_key = self._day_key
+        hour_key = self._hour_key
         
         self.usage_by_day[day_key] += 1
         self.usage_by_hour[hour_key] += 1
         self.usage_by_endpoint[endpoint] += 1
+        if day_key == self._last30_date:
+            self._last30_sum += 1
         
         if assistant_id:
             self.usage_by_assistant[assistant_id] += 1
@@ -752,6 +1150,15 @@ class UsageTracker:
         if self.current_month_usage % 10 == 0:
             self._save_usage_data()
     
+    def _update_usage_keys(self, ts: float):
+        """Format the hour and day usage keys for a timestamp and cache them until the next hour."""
+        timestamp = datetime.fromtimestamp(ts)
+        hour_start = timestamp.replace(minute=0, second=0, microsecond=0)
+        
+        self._hour_key = timestamp.strftime("%Y-%m-%d %H:00")
+        self._day_key = timestamp.strftime("%Y-%m-%d")
+        self._hour_key_expires = (hour_start + timedelta(hours=1)).timestamp()
+    
     def get_current_usage_stats(self) -> Dict[str, Any]:
         """
         Get current usage statistics.
@@ -768,15 +1175,17 @@ class UsageTracker:
             if day.startswith(current_month)
         )
         
-        # Calculate daily average (last 30 days)
-        last_30_days = [
-            (now - timedelta(days=i)).strftime("%Y-%m-%d")
-            for i in range(30)
-        ]
+        # Calculate daily average (last 30 days); recomputed once per day,
+        # track_call keeps it current in between
+        today = now.strftime("%Y-%m-%d")
+        if today != self._last30_date:
+            self._last30_date = today
+            self._last30_sum = sum(
+                self.usage_by_day.get((now - timedelta(days=i)).strftime("%Y-%m-%d"), 0)
+                for i in range(30)
+            )
         
-        last_30_days_usage = sum(
-            self.usage_by_day.get(day, 0) for day in last_30_days
-        )
+        last_30_days_usage = self._last30_sum
         
         daily_average = last_30_days_usage / 30 if last_30_days_usage > 0 else 0
         
@@ -798,12 +1207,18 @@ class UsageTracker:
         else:
             days_until_exhaustion = float('inf')
         
-        # Top assistants by usage
-        top_assistants = sorted(
+        # Top assistants and endpoints by usage; only the top five are
+        # needed, so select them with a heap instead of sorting everything
+        top_assistants = heapq.nlargest(
+            5,
             self.usage_by_assistant.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:5]
+            key=lambda x: x[1]
+        )
+        top_endpoints = heapq.nlargest(
+            5,
+            self.usage_by_endpoint.items(),
+            key=lambda x: x[1]
+        )
         
         return {
             "current_month": current_month,
@@ -816,13 +1231,7 @@ class UsageTracker:
             "projected_percentage": (projected_usage / monthly_limit) * 100 if monthly_limit > 0 else 0,
             "days_until_quota_exhaustion": round(days_until_exhaustion, 1) if days_until_exhaustion != float('inf') else None,
             "top_assistants": dict(top_assistants),
-            "top_endpoints": dict(
-                sorted(
-                    self.usage_by_endpoint.items(),
-                    key=lambda x: x[1],
-                    reverse=True
-                )[:5]
-            )
+            "top_endpoints": dict(top_endpoints)
         }
     
     def visualize_usage(self, output_dir: str = "reports"):
@@ -832,78 +1241,91 @@ class UsageTracker:
         Args:
             output_dir: Directory to save visualizations
         """
+        plt = _pyplot()
         os.makedirs(output_dir, exist_ok=True)
         
-        # Daily usage (last 30 days)
+        # Reuse one figure for every chart instead of building a new one each time;
+        # fixed margins leave room for the rotated tick labels without running
+        # the layout solver for each chart
+        fig, ax = plt.subplots(figsize=(14, 6))
+        fig.subplots_adjust(bottom=0.2)
+        
+        # Daily usage (last 30 days); key lists are cached until the day changes
         now = datetime.now()
-        days = [
-            (now - timedelta(days=i)).strftime("%Y-%m-%d")
-            for i in range(29, -1, -1)
-        ]
-        
-        values = [self.usage_by_day.get(day, 0) for day in days]
-        
-        plt.figure(figsize=(14, 6))
-        plt.bar(range(len(days)), values)
-        plt.title("Daily API Usage (Last 30 Days)")
-        plt.xlabel("Date")
-        plt.ylabel("API Calls")
-        plt.xticks(range(0, len(days), 3), [days[i][5:] for i in range(0, len(days), 3)], rotation=45)
-        plt.tight_layout()
-        plt.savefig(os.path.join(output_dir, "daily_usage.png"))
-        plt.close()
+        days = _day_keys(now.date(), 30)
+        
+        values = np.fromiter(
+            (self.usage_by_day.get(day, 0) for day in days),
+            dtype=np.int64,
+            count=len(days)
+        )
+        
+        ax.bar(range(len(days)), values)
+        ax.set_title("Daily API Usage (Last 30 Days)")
+        ax.set_xlabel("Date")
+        ax.set_ylabel("API Calls")
+        ax.set_xticks(range(0, len(days), 3))
+        ax.set_xticklabels([days[i][5:] for i in range(0, len(days), 3)], rotation=45)
+        fig.savefig(os.path.join(output_dir, "daily_usage.png"))
         
         # Hourly usage (last 24 hours)
-        hours = [
-            (now - timedelta(hours=i)).strftime("%Y-%m-%d %H:00")
-            for i in range(23, -1, -1)
-        ]
-        
-        hour_values = [self.usage_by_hour.get(hour, 0) for hour in hours]
-        
-        plt.figure(figsize=(14, 6))
-        plt.bar(range(len(hours)), hour_values)
-        plt.title("Hourly API Usage (Last 24 Hours)")
-        plt.xlabel("Hour")
-        plt.ylabel("API Calls")
-        plt.xticks(range(0, len(hours), 2), [hours[i].split()[1] for i in range(0, len(hours), 2)], rotation=45)
-        plt.tight_layout()
-        plt.savefig(os.path.join(output_dir, "hourly_usage.png"))
-        plt.close()
-        
-        # Monthly quota usage
+        hours = _hour_keys(now.replace(minute=0, second=0, microsecond=0), 24)
+        
+        hour_values = np.fromiter(
+            (self.usage_by_hour.get(hour, 0) for hour in hours),
+            dtype=np.int64,
+            count=len(hours)
+        )
+        
+        ax.clear()
+        ax.bar(range(len(hours)), hour_values)
+        ax.set_title("Hourly API Usage (Last 24 Hours)")
+        ax.set_xlabel("Hour")
+        ax.set_ylabel("API Calls")
+        ax.set_xticks(range(0, len(hours), 2))
+        ax.set_xticklabels([hours[i].split()[1] for i in range(0, len(hours), 2)], rotation=45)
+        fig.savefig(os.path.join(output_dir, "hourly_usage.png"))
+        
+        # Usage by assistant
+        if self.usage_by_assistant:
+            assistants = list(self.usage_by_assistant.keys())
+            assistant_values = np.fromiter(
+                self.usage_by_assistant.values(),
+                dtype=np.int64,
+                count=len(assistants)
+            )
+            
+            ax.clear()
+            fig.set_size_inches(10, 6)
+            ax.bar(range(len(assistants)), assistant_values)
+            ax.set_title("API Usage by Assistant")
+            ax.set_xlabel("Assistant")
+            ax.set_ylabel("API Calls")
+            ax.set_xticks(range(len(assistants)))
+            ax.set_xticklabels([a[:8] + "..." for a in assistants], rotation=45)
+            fig.savefig(os.path.join(output_dir, "assistant_usage.png"))
+        
+        # Monthly quota usage; drawn last because the pie turns off the axes
+        # frame and fixes the aspect ratio
         current_stats = self.get_current_usage_stats()
         
         used = current_stats["current_month_usage"]
         remaining = current_stats["remaining_quota"]
         
-        plt.figure(figsize=(8, 8))
-        plt.pie(
-            [used, remaining],
+        ax.clear()
+        fig.set_size_inches(8, 8)
+        ax.pie(
+            np.array([used, remaining], dtype=np.int64),
             labels=["Used", "Remaining"],
             colors=["#ff9999", "#66b3ff"],
             autopct='%1.1f%%',
             startangle=90
         )
-        plt.axis('equal')
-        plt.title(f"Monthly Quota Usage ({current_stats['quota_usage_percentage']:.1f}%)")
-        plt.savefig(os.path.join(output_dir, "quota_usage.png"))
-        plt.close()
+        ax.axis('equal')
+        ax.set_title(f"Monthly Quota Usage ({current_stats['quota_usage_percentage']:.1f}%)")
+        fig.savefig(os.path.join(output_dir, "quota_usage.png"))
         
-        # Usage by assistant
-        if self.usage_by_assistant:
-            assistants = list(self.usage_by_assistant.keys())
-            assistant_values = list(self.usage_by_assistant.values())
-            
-            plt.figure(figsize=(10, 6))
-            plt.bar(range(len(assistants)), assistant_values)
-            plt.title("API Usage by Assistant")
-            plt.xlabel("Assistant")
-            plt.ylabel("API Calls")
-            plt.xticks(range(len(assistants)), [a[:8] + "..." for a in assistants], rotation=45)
-            plt.tight_layout()
-            plt.savefig(os.path.join(output_dir, "assistant_usage.png"))
-            plt.close()
+        plt.close(fig)
         
         logger.info(f"Usage visualizations saved to {output_dir}")
     
@@ -914,15 +1336,15 @@ class UsageTracker:
             usage_data = {
                 "timestamp": datetime.now().isoformat(),
                 "current_month_usage": self.current_month_usage,
-                "usage_by_day": dict(self.usage_by_day),
-                "usage_by_hour": dict(self.usage_by_hour),
-                "usage_by_endpoint": dict(self.usage_by_endpoint),
-                "usage_by_assistant": dict(self.usage_by_assistant)
+                "usage_by_day": self.usage_by_day,
+                "usage_by_hour": self.usage_by_hour,
+                "usage_by_endpoint": self.usage_by_endpoint,
+                "usage_by_assistant": self.usage_by_assistant
             }
             
             # Save to file (append mode)
-            with open(self.data_file, "a") as f:
-                f.write(json.dumps(usage_data) + "\n")
+            with open(self.data_file, "ab") as f:
+                f.write(_dumps_line(usage_data))
                 
             logger.debug("Usage data saved to file")
             
@@ -931,27 +1353,26 @@ class UsageTracker:
     
     def _load_usage_data(self):
         """Load usage data from file if it exists."""
-        if not os.path.exists(self.data_file):
-            logger.info(f"No usage data file found at {self.data_file}")
-            return
-        
         try:
-            with open(self.data_file, "r") as f:
-                # Read the last line (most recent data)
-                lines = f.readlines()
-                if not lines:
-                    return
-                
-                latest_data = json.loads(lines[-1])
-                
-                # Restore usage data
-                self.current_month_usage = latest_data["current_month_usage"]
-                self.usage_by_day = defaultdict(int, latest_data["usage_by_day"])
-                self.usage_by_hour = defaultdict(int, latest_data["usage_by_hour"])
-                self.usage_by_endpoint = defaultdict(int, latest_data["usage_by_endpoint"])
-                self.usage_by_assistant = defaultdict(int, latest_data["usage_by_assistant"])
-                
-                logger.info(f"Loaded usage data from {self.data_file}")
+            # Read only the last line (most recent data) instead of the whole history
+            try:
+                last_line = _read_last_line(self.data_file)
+            except FileNotFoundError:
+                logger.info(f"No usage data file found at {self.data_file}")
+                return
+            if last_line is None:
+                return
+            
+            latest_data = _loads_line(last_line)
+            
+            # Restore usage data
+            self.current_month_usage = latest_data["current_month_usage"]
+            self.usage_by_day = defaultdict(int, latest_data["usage_by_day"])
+            self.usage_by_hour = defaultdict(int, latest_data["usage_by_hour"])
+            self.usage_by_endpoint = defaultdict(int, latest_data["usage_by_endpoint"])
+            self.usage_by_assistant = defaultdict(int, latest_data["usage_by_assistant"])
+            
+            logger.info(f"Loaded usage data from {self.data_file}")
                 
         except Exception as e:
             logger.error(f"Failed to load usage data: {e}")
@@ -8,15 +8,114 @@ This module provides functions to extract audio from video files for
 analysis with Pyunto Intelligence.
 """
 
+import io
 import os
+import json
 import subprocess
 import uuid
+import itertools
+import wave
+import struct
+import types
 import base64
 import logging
-from typing import Optional, Dict, Any, Union
+import functools
+from typing import Optional, Dict, Any, Union, BinaryIO, Iterator
+
+try:
+    import av
+except ImportError:
+    av = None  # Fall back to the ffmpeg command-line tool
 
 logger = logging.getLogger(__name__)
 
+# Default audio codec for each output format
+FORMAT_TO_CODEC = types.MappingProxyType({
+    "wav": "pcm_s16le",  # 16-bit PCM
+    "mp3": "libmp3lame",
+    "aac": "aac",
+    "ogg": "libvorbis",
+    "flac": "flac",
+    "m4a": "aac"
+})
+
+# MIME type for each output format
+MIME_TYPES = types.MappingProxyType({
+    "wav": "audio/wav",
+    "mp3": "audio/mpeg",
+    "aac": "audio/aac",
+    "ogg": "audio/ogg",
+    "flac": "audio/flac",
+    "m4a": "audio/mp4"
+})
+
+# ffprobe codec names for encoders whose names differ from the codec they produce
+ENCODER_CODEC_NAMES = types.MappingProxyType({
+    "libmp3lame": "mp3",
+    "libvorbis": "vorbis"
+})
+
+# Output formats that ffmpeg can stream to a pipe, mapped to their muxer names.
+# Formats missing here (such as m4a) need a seekable output file.
+PIPE_MUXERS = types.MappingProxyType({
+    "wav": "wav",
+    "mp3": "mp3",
+    "aac": "adts",
+    "ogg": "ogg",
+    "flac": "flac"
+})
+
+
+def _fix_wav_sizes(wav_data: bytes) -> bytes:
+    """Fill in the RIFF and data chunk sizes that ffmpeg leaves unset when writing WAV to a pipe."""
+    if wav_data[:4] != b"RIFF" or wav_data[8:12] != b"WAVE":
+        return wav_data
+
+    patched = bytearray(wav_data)
+    struct.pack_into("<I", patched, 4, len(wav_data) - 8)
+
+    # Walk the chunks up to the data chunk, which runs to the end of the stream
+    pos = 12
+    while pos + 8 <= len(wav_data):
+        chunk_id = wav_data[pos:pos + 4]
+        if chunk_id == b"data":
+            struct.pack_into("<I", patched, pos + 4, len(wav_data) - pos - 8)
+            break
+        chunk_size = struct.unpack_from("<I", wav_data, pos + 4)[0]
+        pos += 8 + chunk_size + (chunk_size & 1)
+
+    return bytes(patched)
+
+
+@functools.lru_cache(maxsize=1024)
+def _probe_audio_stream(video_file_path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """
+    Run ffprobe on the first audio stream of a file.
+    
+    mtime_ns and size are only part of the cache key, so a file that
+    changes on disk is probed again. Failures raise and are not cached.
+    """
+    # Run ffprobe command to get information about audio streams
+    result = subprocess.run([
+        'ffprobe',
+        '-v', 'error',
+        '-select_streams', 'a:0',  # Select the first audio stream
+        '-show_entries', 'stream=codec_name,channels,sample_rate,bit_rate,duration',
+        '-of', 'json',
+        video_file_path
+    ], check=True, capture_output=True, text=True)
+    
+    # Parse the JSON output
+    info = json.loads(result.stdout)
+    
+    # Extract the relevant information
+    if 'streams' in info and len(info['streams']) > 0:
+        return info['streams'][0]
+    
+    logger.warning(f"No audio streams found in {video_file_path}")
+    return {}
+
+
 class AudioExtractor:
     def __init__(self, temp_dir: str = "/tmp/pyunto_audio"):
         """
@@ -28,19 +127,23 @@ class AudioExtractor:
         self.temp_dir = temp_dir
         os.makedirs(temp_dir, exist_ok=True)
         
-    def _create_process_dir(self) -> str:
-        """Create a unique processing directory for the current job."""
-        process_id = str(uuid.uuid4())
-        process_dir = os.path.join(self.temp_dir, process_id)
-        os.makedirs(process_dir, exist_ok=True)
-        return process_dir
-
-    def _clean_process_dir(self, process_dir: str):
-        """Clean up temporary processing directory."""
+        # Temp files share temp_dir; the per-instance prefix keeps names unique
+        # across extractors and processes, the counter across jobs
+        self._temp_prefix = uuid.uuid4().hex
+        self._temp_counter = itertools.count()
+        
+    def _temp_path(self, suffix: str) -> str:
+        """Return a unique path in temp_dir for a job's temporary file."""
+        return os.path.join(self.temp_dir, f"{self._temp_prefix}_{next(self._temp_counter)}{suffix}")
+
+    def _remove_temp_file(self, path: str):
+        """Delete a temporary file if it exists."""
         try:
-            subprocess.run(['rm', '-rf', process_dir], check=True)
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Failed to clean process directory: {e}")
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(f"Failed to remove temporary file: {e}")
 
     def _get_default_codec(self, format: str) -> str:
         """
@@ -52,16 +155,142 @@ class AudioExtractor:
         Returns:
             Default codec for the format
         """
-        format_to_codec = {
-            "wav": "pcm_s16le",  # 16-bit PCM
-            "mp3": "libmp3lame",
-            "aac": "aac",
-            "ogg": "libvorbis",
-            "flac": "flac",
-            "m4a": "aac"
-        }
+        return FORMAT_TO_CODEC.get(format.lower(), "pcm_s16le")
+
+    def _can_decode_with_av(self, format: str, codec: str, channels: int) -> bool:
+        """Check whether PyAV is available and can produce the requested output in-process."""
+        return (
+            av is not None and
+            format.lower() == "wav" and
+            codec == "pcm_s16le" and
+            channels in (1, 2)
+        )
+
+    def _extract_wav_with_av(self, source: Union[str, BinaryIO],
+                             sample_rate: int,
+                             channels: int) -> bytes:
+        """
+        Decode and resample the first audio stream to 16-bit PCM WAV using PyAV.
         
-        return format_to_codec.get(format.lower(), "pcm_s16le")
+        Args:
+            source: Path or file-like object containing the video
+            sample_rate: Audio sample rate in Hz
+            channels: Number of audio channels (1 or 2)
+            
+        Returns:
+            WAV audio data
+        """
+        resampler = av.AudioResampler(
+            format="s16",
+            layout="mono" if channels == 1 else "stereo",
+            rate=sample_rate
+        )
+        output = io.BytesIO()
+        
+        try:
+            with av.open(source) as container, wave.open(output, "wb") as wav_file:
+                wav_file.setnchannels(channels)
+                wav_file.setsampwidth(2)
+                wav_file.setframerate(sample_rate)
+                
+                for frame in container.decode(audio=0):
+                    for resampled in resampler.resample(frame):
+                        wav_file.writeframes(resampled.to_ndarray().tobytes())
+                
+                # Flush samples still buffered in the resampler
+                for resampled in resampler.resample(None):
+                    wav_file.writeframes(resampled.to_ndarray().tobytes())
+            
+            return output.getvalue()
+        
+        except Exception as e:
+            logger.error(f"PyAV error: {str(e)}")
+            raise
+
+    def _run_ffmpeg(self, input_path: str,
+                    sample_rate: int,
+                    channels: int,
+                    format: str,
+                    codec: str) -> bytes:
+        """
+        Run ffmpeg on an input file and return the encoded audio.
+        
+        Args:
+            input_path: Path to the video file
+            sample_rate: Audio sample rate in Hz
+            channels: Number of audio channels
+            format: Output audio format
+            codec: Audio codec to use
+            
+        Returns:
+            Extracted audio data in the specified format
+        """
+        # Extract audio using ffmpeg command
+        ffmpeg_cmd = [
+            'ffmpeg', '-i', input_path,
+            '-vn',  # Disable video
+            '-acodec', codec
+        ]
+        if codec != "copy":
+            ffmpeg_cmd += [
+                '-ar', str(sample_rate),  # Sample rate
+                '-ac', str(channels)      # Audio channels
+            ]
+
+        muxer = PIPE_MUXERS.get(format.lower())
+        if muxer is not None:
+            # Read the encoded audio straight from stdout instead of a temp file
+            result = subprocess.run(ffmpeg_cmd + ['-f', muxer, 'pipe:1'], check=True, capture_output=True)
+            if muxer == "wav":
+                return _fix_wav_sizes(result.stdout)
+            return result.stdout
+
+        # Set output file extension
+        output_path = self._temp_path(f".{format}")
+        try:
+            subprocess.run(ffmpeg_cmd + ['-y', output_path], check=True, capture_output=True)
+
+            # Read audio data
+            with open(output_path, "rb") as f:
+                return f.read()
+        finally:
+            self._remove_temp_file(output_path)
+
+    def _extract_without_transcoding(self, file_path: str,
+                                     input_format: str,
+                                     sample_rate: int,
+                                     channels: int,
+                                     format: str,
+                                     codec: str) -> Optional[bytes]:
+        """
+        Return the audio of an audio file as-is, or remuxed, when its stream
+        already has the requested codec, sample rate and channel count.
+        
+        Args:
+            file_path: Path to the audio file
+            input_format: Format of the input file, from its extension
+            sample_rate: Requested sample rate in Hz
+            channels: Requested number of channels
+            format: Requested output format
+            codec: Requested audio codec
+            
+        Returns:
+            Audio data, or None if the stream has to be transcoded
+        """
+        info = self.get_audio_info(file_path)
+        if (not info or
+                info.get("codec_name") != ENCODER_CODEC_NAMES.get(codec, codec) or
+                str(info.get("sample_rate")) != str(sample_rate) or
+                info.get("channels") != channels):
+            return None
+
+        if input_format == format.lower():
+            # Same container and stream: the file already is the requested output
+            with open(file_path, "rb") as f:
+                return f.read()
+
+        # Same stream in a different container: remux without re-encoding
+        return self._run_ffmpeg(file_path, sample_rate, channels, format, "copy")
 
     def extract_audio(self, video_data: bytes, 
                      sample_rate: int = 16000, 
@@ -81,38 +310,21 @@ class AudioExtractor:
         Returns:
             Extracted audio data in the specified format
         """
-        process_dir = self._create_process_dir()
+        # Determine codec if not specified
+        if codec is None:
+            codec = self._get_default_codec(format)
+
+        # Decode in-process when possible, skipping the temp files and ffmpeg process
+        if self._can_decode_with_av(format, codec, channels):
+            return self._extract_wav_with_av(io.BytesIO(video_data), sample_rate, channels)
+
+        input_path = self._temp_path(".mp4")
         try:
             # Save input video temporarily
-            input_path = os.path.join(process_dir, "input.mp4")
             with open(input_path, "wb") as f:
                 f.write(video_data)
 
-            # Determine codec if not specified
-            if codec is None:
-                codec = self._get_default_codec(format)
-
-            # Set output file extension
-            output_path = os.path.join(process_dir, f"audio.{format}")
-
-            # Extract audio using ffmpeg command
-            ffmpeg_cmd = [
-                'ffmpeg', '-i', input_path,
-                '-vn',  # Disable video
-                '-acodec', codec,
-                '-ar', str(sample_rate),  # Sample rate
-                '-ac', str(channels),     # Audio channels
-                '-y',  # Overwrite output file
-                output_path
-            ]
-            
-            subprocess.run(ffmpeg_cmd, check=True, capture_output=True)
-
-            # Read audio data
-            with open(output_path, "rb") as f:
-                audio_data = f.read()
-
-            return audio_data
+            return self._run_ffmpeg(input_path, sample_rate, channels, format, codec)
 
         except subprocess.CalledProcessError as e:
             logger.error(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
@@ -121,7 +333,7 @@ class AudioExtractor:
             logger.error(f"Error extracting audio: {str(e)}")
             raise
         finally:
-            self._clean_process_dir(process_dir)
+            self._remove_temp_file(input_path)
             
     def extract_audio_from_file(self, video_file_path: str, 
                                sample_rate: int = 16000, 
@@ -141,9 +353,31 @@ class AudioExtractor:
         Returns:
             Extracted audio data in the specified format
         """
-        with open(video_file_path, "rb") as f:
-            video_data = f.read()
-        return self.extract_audio(video_data, sample_rate, channels, format, codec)
+        # Determine codec if not specified
+        if codec is None:
+            codec = self._get_default_codec(format)
+
+        try:
+            # Audio files that already match the request may not need transcoding
+            input_format = os.path.splitext(video_file_path)[1][1:].lower()
+            if input_format in FORMAT_TO_CODEC:
+                audio_data = self._extract_without_transcoding(
+                    video_file_path, input_format, sample_rate, channels, format, codec
+                )
+                if audio_data is not None:
+                    return audio_data
+
+            if self._can_decode_with_av(format, codec, channels):
+                return self._extract_wav_with_av(video_file_path, sample_rate, channels)
+
+            # ffmpeg reads the file directly, so it is never loaded into memory here
+            return self._run_ffmpeg(video_file_path, sample_rate, channels, format, codec)
+        except subprocess.CalledProcessError as e:
+            logger.error(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
+            raise
+        except Exception as e:
+            logger.error(f"Error extracting audio: {str(e)}")
+            raise
     
     def save_audio(self, audio_data: bytes, output_path: str) -> None:
         """
@@ -168,22 +402,34 @@ class AudioExtractor:
         Returns:
             Dictionary with base64-encoded audio ready for API transmission
         """
-        mime_types = {
-            "wav": "audio/wav",
-            "mp3": "audio/mpeg",
-            "aac": "audio/aac",
-            "ogg": "audio/ogg",
-            "flac": "audio/flac",
-            "m4a": "audio/mp4"
-        }
-        
-        mime_type = mime_types.get(format.lower(), "audio/wav")
+        mime_type = MIME_TYPES.get(format.lower(), "audio/wav")
         
         return {
-            "data": base64.b64encode(audio_data).decode('utf-8'),
+            "data": base64.b64encode(audio_data).decode('ascii'),
             "mimeType": mime_type
         }
     
+    def iter_audio_base64(self, audio_data: bytes, chunk_size: int = 768 * 1024) -> Iterator[bytes]:
+        """
+        Base64-encode audio data in chunks, for streaming large payloads.
+        
+        Joining the chunks gives the same result as base64.b64encode(audio_data),
+        without holding the whole encoded copy in memory.
+        
+        Args:
+            audio_data: Binary audio data
+            chunk_size: Number of input bytes per chunk, rounded down to a multiple
+                of 3 so padding only appears in the last chunk (default: 768 KiB)
+            
+        Returns:
+            Iterator over ASCII base64 chunks
+        """
+        chunk_size = max(3, chunk_size - chunk_size % 3)
+        view = memoryview(audio_data)
+        
+        for start in range(0, len(view), chunk_size):
+            yield base64.b64encode(view[start:start + chunk_size])
+    
     def get_audio_info(self, video_file_path: str) -> Dict[str, Any]:
         """
         Get audio information from a video file using ffprobe.
@@ -195,26 +441,10 @@ class AudioExtractor:
             Dictionary containing audio stream information
         """
         try:
-            # Run ffprobe command to get information about audio streams
-            result = subprocess.run([
-                'ffprobe',
-                '-v', 'error',
-                '-select_streams', 'a:0',  # Select the first audio stream
-                '-show_entries', 'stream=codec_name,channels,sample_rate,bit_rate,duration',
-                '-of', 'json',
-                video_file_path
-            ], check=True, capture_output=True, text=True)
-            
-            # Parse the JSON output
-            import json
-            info = json.loads(result.stdout)
-            
-            # Extract the relevant information
-            if 'streams' in info and len(info['streams']) > 0:
-                return info['streams'][0]
-            else:
-                logger.warning(f"No audio streams found in {video_file_path}")
-                return {}
+            # Results are cached until the file's modification time or size changes
+            stat = os.stat(video_file_path)
+            info = _probe_audio_stream(video_file_path, stat.st_mtime_ns, stat.st_size)
+            return dict(info)
                 
         except subprocess.CalledProcessError as e:
             logger.error(f"FFprobe error: {e.stderr if e.stderr else str(e)}")
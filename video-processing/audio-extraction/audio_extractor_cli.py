@@ -12,11 +12,14 @@ import os
 import sys
 import argparse
 import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 from audio_extractor import AudioExtractor
 
 logger = logging.getLogger(__name__)
 
+VIDEO_EXTENSIONS = frozenset({'.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm'})
+
 def setup_logging(verbose=False):
     """Configure logging."""
     log_level = logging.DEBUG if verbose else logging.INFO
@@ -75,6 +78,13 @@ def parse_arguments():
         help="Process videos in subdirectories recursively"
     )
     
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of files to process in parallel (default: number of CPUs)"
+    )
+    
     parser.add_argument(
         "--info",
         action="store_true",
@@ -90,8 +100,11 @@ def parse_arguments():
     return parser.parse_args()
 
 def process_video_file(extractor, video_path, output_path, format, sample_rate, channels, codec):
-    """Process a single video file."""
+    """Process a single video file. Pass extractor=None to create one (e.g. in a worker process)."""
     try:
+        if extractor is None:
+            extractor = AudioExtractor()
+        
         logger.info(f"Processing {video_path}")
         logger.info(f"Output: {output_path}, Format: {format}, Sample rate: {sample_rate}, Channels: {channels}")
         
@@ -117,38 +130,47 @@ def process_video_file(extractor, video_path, output_path, format, sample_rate,
         logger.error(f"Error processing {video_path}: {str(e)}")
         return False
 
+def _scan_video_files(directory, recursive, video_files):
+    """Append video files in directory to video_files, in os.walk order."""
+    subdirs = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            # DirEntry caches the file type, so no extra stat per file
+            if entry.is_file():
+                if os.path.splitext(entry.name)[1].lower() in VIDEO_EXTENSIONS:
+                    video_files.append(entry.path)
+            elif recursive and entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+    
+    for subdir in subdirs:
+        try:
+            _scan_video_files(subdir, recursive, video_files)
+        except OSError as e:
+            # Like os.walk, skip subdirectories that cannot be read
+            logger.debug(f"Skipping {subdir}: {str(e)}")
+
 def find_video_files(input_path, recursive=False):
     """Find video files in the input path."""
     if os.path.isfile(input_path):
         return [input_path]
     
-    video_extensions = ['.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm']
-    
-    if recursive:
-        video_files = []
-        for root, _, files in os.walk(input_path):
-            for file in files:
-                if any(file.lower().endswith(ext) for ext in video_extensions):
-                    video_files.append(os.path.join(root, file))
-        return video_files
-    else:
-        return [
-            os.path.join(input_path, f) 
-            for f in os.listdir(input_path) 
-            if os.path.isfile(os.path.join(input_path, f)) and 
-            any(f.lower().endswith(ext) for ext in video_extensions)
-        ]
+    video_files = []
+    _scan_video_files(input_path, recursive, video_files)
+    return video_files
 
-def show_audio_info(extractor, video_files):
+def show_audio_info(extractor, video_files, max_workers=1):
     """Show audio information for video files."""
-    for video_file in video_files:
-        print(f"\nAudio Information for {video_file}:")
-        info = extractor.get_audio_info(video_file)
-        if info:
-            for key, value in info.items():
-                print(f"  {key}: {value}")
-        else:
-            print("  No audio stream found or error getting information")
+    # ffprobe runs in its own process, so threads are enough to overlap the probes
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        infos = executor.map(extractor.get_audio_info, video_files)
+        
+        for video_file, info in zip(video_files, infos):
+            print(f"\nAudio Information for {video_file}:")
+            if info:
+                for key, value in info.items():
+                    print(f"  {key}: {value}")
+            else:
+                print("  No audio stream found or error getting information")
 
 def main():
     """Main function for the command-line interface."""
@@ -170,13 +192,12 @@ def main():
         
         # If --info flag is set, just show audio information
         if args.info:
-            show_audio_info(extractor, video_files)
+            show_audio_info(extractor, video_files, args.jobs)
             return
         
-        # Process each video file
-        success_count = 0
+        # Determine output path for each file based on input and args.output
+        jobs = []
         for video_file in video_files:
-            # Determine output path based on input and args.output
             if os.path.isdir(args.output) or len(video_files) > 1:
                 # If output is a directory or multiple files, create output filename
                 os.makedirs(args.output, exist_ok=True)
@@ -185,17 +206,42 @@ def main():
             else:
                 # Use the specified output filename
                 output_file = args.output
-            
-            if process_video_file(
-                extractor,
-                video_file,
-                output_file,
-                args.format,
-                args.sample_rate,
-                args.channels,
-                args.codec
-            ):
-                success_count += 1
+            jobs.append((video_file, output_file))
+        
+        # Process each video file
+        success_count = 0
+        max_workers = max(1, min(args.jobs, len(jobs)))
+        if max_workers == 1:
+            for video_file, output_file in jobs:
+                if process_video_file(
+                    extractor,
+                    video_file,
+                    output_file,
+                    args.format,
+                    args.sample_rate,
+                    args.channels,
+                    args.codec
+                ):
+                    success_count += 1
+        else:
+            # Files are independent, so run one extraction per worker process
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [
+                    executor.submit(
+                        process_video_file,
+                        None,
+                        video_file,
+                        output_file,
+                        args.format,
+                        args.sample_rate,
+                        args.channels,
+                        args.codec
+                    )
+                    for video_file, output_file in jobs
+                ]
+                for future in as_completed(futures):
+                    if future.result():
+                        success_count += 1
         
         logger.info(f"Processing complete! Successfully processed {success_count} of {len(video_files)} files.")
         
@@ -12,16 +12,235 @@ import os
 import subprocess
 import logging
 import json
-from typing import Optional, Dict, Any, List, Tuple
+import math
+import shlex
+import errno
+import shutil
+import tempfile
+import functools
+import contextlib
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Optional, Dict, Any, List, Tuple, Set, Iterable, Iterator, Callable
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Fall back to the standard json module
 
 logger = logging.getLogger(__name__)
 
+# Hardware H.264 encoders, in order of preference
+HARDWARE_H264_ENCODERS = ('h264_nvenc', 'h264_qsv', 'h264_vaapi', 'h264_videotoolbox')
+
+# Keep FFmpeg quiet apart from errors, so stderr stays small enough to keep for error reports
+FFMPEG_QUIET_OPTIONS = ['-hide_banner', '-nostats', '-loglevel', 'error']
+
+# Stream properties that must match for inputs to be concatenated without re-encoding
+CONCAT_STREAM_KEYS = ('codec_type', 'codec_name', 'width', 'height', 'pix_fmt', 'r_frame_rate',
+                      'time_base', 'sample_rate', 'channels')
+
+# Software encoders for archival copies, in order of preference
+ARCHIVE_ENCODERS = ('libsvtav1', 'libx265')
+
+# Software encoders whose output is converted to 4:2:0 for player compatibility
+YUV420_ENCODERS = ('libx264', 'libx265', 'libsvtav1')
+
+# The ffprobe fields this module reads itself; leaving out tags and
+# dispositions keeps the JSON small
+PROBE_ENTRIES = ('format=duration:stream=index,codec_type,codec_name,width,height,pix_fmt,'
+                 'avg_frame_rate,r_frame_rate,time_base,sample_rate,channels')
+
+# Fraction by which a video may exceed max_dimension before it is worth resizing
+RESIZE_TOLERANCE = 0.05
+
+# Input codecs that NVDEC decodes, so frames can stay on the GPU
+NVDEC_CODECS = ('h264', 'hevc', 'vp8', 'vp9', 'av1', 'mpeg2video')
+
+# Render node used for VAAPI encoding
+VAAPI_DEVICE = '/dev/dri/renderD128'
+
+# Decode options, encoders, upload/scale filters and quality option for each
+# hardware acceleration method
+HWACCEL_PROFILES = {
+    'cuda': {
+        'input_options': ['-hwaccel', 'cuda', '-hwaccel_output_format', 'cuda'],
+        'h264': 'h264_nvenc',
+        'hevc': 'hevc_nvenc',
+        'upload': None,
+        'scale': 'scale_cuda',
+        'quality': '-cq'
+    },
+    'vaapi': {
+        'input_options': ['-vaapi_device', VAAPI_DEVICE, '-hwaccel', 'vaapi', '-hwaccel_output_format', 'vaapi'],
+        'h264': 'h264_vaapi',
+        'hevc': 'hevc_vaapi',
+        'upload': 'format=nv12|vaapi,hwupload',  # Also covers inputs decoded in software
+        'scale': 'scale_vaapi',
+        'quality': '-qp'
+    },
+    'qsv': {
+        'input_options': [],
+        'h264': 'h264_qsv',
+        'hevc': 'hevc_qsv',
+        'upload': None,
+        'scale': None,
+        'quality': '-global_quality'
+    },
+    'videotoolbox': {
+        'input_options': ['-hwaccel', 'videotoolbox'],
+        'h264': 'h264_videotoolbox',
+        'hevc': 'hevc_videotoolbox',
+        'upload': None,
+        'scale': None,
+        'quality': None  # -q:v runs the other way from CRF, so CRF is not mapped
+    }
+}
+
+# Mode for new output files, as open() would create them under the process
+# umask (read once here, since reading it means briefly changing it)
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+OUTPUT_FILE_MODE = 0o666 & ~_UMASK
+
+# x264 preset names mapped to NVENC presets
+NVENC_PRESETS = {
+    'ultrafast': 'p1', 'superfast': 'p1', 'veryfast': 'p2', 'faster': 'p3', 'fast': 'p3',
+    'medium': 'p4', 'slow': 'p6', 'slower': 'p7', 'veryslow': 'p7'
+}
+
+# x264 preset names that QSV encoders also accept
+QSV_PRESETS = ('veryfast', 'faster', 'fast', 'medium', 'slow', 'slower', 'veryslow')
+
+
+def _parse_frame_rate(rate: Optional[str]) -> float:
+    """Parse an FFprobe frame rate such as "30000/1001" (0.0 if unknown)."""
+    try:
+        num, _, den = (rate or "0").partition('/')
+        return float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+
+def _log_command(cmd: List[str]):
+    """Log an FFmpeg command at DEBUG level, quoted so it can be pasted into a shell."""
+    # Skip building the string unless it will be logged
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Running FFmpeg command: %s", shlex.join(cmd))
+
+
+def _concat_list(paths: List[str]) -> bytes:
+    """Build a concat demuxer script for the given files, to be piped to FFmpeg."""
+    lines = []
+    for path in paths:
+        # The file: prefix stops paths being resolved against the pipe: URL
+        escaped_path = os.path.abspath(path).replace("'", "'\\''")
+        lines.append(f"file 'file:{escaped_path}'\n")
+    return ''.join(lines).encode()
+
+
+def _drop_cache(path: str, sync: bool = False):
+    """
+    Ask the kernel to drop a file from the page cache.
+    
+    Dirty pages are not dropped, so files that were just written need sync=True
+    to flush them first. Does nothing where posix_fadvise is unavailable.
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    
+    try:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            if sync:
+                os.fdatasync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    except OSError as e:
+        logger.debug(f"Could not drop {path} from page cache: {str(e)}")
+
+
+@functools.lru_cache(maxsize=256)
+def _probe_video(video_path: str, mtime_ns: int, size: int, entries: Optional[str] = None,
+                 cache_dir: Optional[str] = None) -> str:
+    """
+    Run ffprobe on a file and return its JSON output.
+    
+    Only the given entries are shown if entries is set, otherwise the full
+    format and streams. mtime_ns and size are only part of the cache key, so
+    a file that changes on disk is probed again. Failures raise and are not
+    cached.
+    
+    If cache_dir is set, the output is also kept there as a .ffprobe.json file
+    under the same key, so other processes and later runs skip the probe.
+    """
+    cache_path = None
+    if cache_dir:
+        key = f"{os.path.abspath(video_path)}\0{mtime_ns}\0{size}\0{entries}"
+        cache_path = os.path.join(
+            cache_dir, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.ffprobe.json'
+        )
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            pass
+    
+    cmd = ['ffprobe', '-v', 'quiet', '-print_format', 'json']
+    if entries:
+        cmd.extend(['-show_entries', entries])
+    else:
+        cmd.extend(['-show_format', '-show_streams'])
+    cmd.append(video_path)
+    
+    result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+    
+    if cache_path:
+        # Write to a temporary name first so concurrent readers never see a partial file
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix='.part')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(result.stdout)
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Could not write probe cache {cache_path}: {str(e)}")
+    
+    return result.stdout
+
+
 class VideoConverter:
-    def __init__(self):
+    # Set once FFmpeg has been found, so later instances skip the check
+    _ffmpeg_checked = False
+
+    def __init__(self, drop_page_cache: bool = False, probe_cache_dir: Optional[str] = None):
         """
         Initialize the video converter.
+        
+        Args:
+            drop_page_cache: Drop inputs and outputs from the page cache after
+                convert_video, trim_video and concat_videos, so long batches do not
+                push out memory that other work is using
+            probe_cache_dir: Directory to keep ffprobe results in, shared by
+                worker processes and reused by later runs (default: memory only)
         """
-        # Check if FFmpeg is installed
+        self._check_ffmpeg()
+        self.drop_page_cache = drop_page_cache
+        self.probe_cache_dir = probe_cache_dir
+        
+        # Available encoders, the H.264 encoder and CUDA support, looked up on first use
+        self._encoders = None
+        self._h264_encoder = None
+        self._cuda_pipeline = None
+        self._hwaccels = None
+
+    @classmethod
+    def _check_ffmpeg(cls):
+        """Check once per process that FFmpeg is installed."""
+        if cls._ffmpeg_checked:
+            return
+        
         try:
             subprocess.run(['ffmpeg', '-version'], 
                           check=True, 
@@ -30,28 +249,171 @@ class VideoConverter:
         except (subprocess.SubprocessError, FileNotFoundError):
             logger.error("FFmpeg is not installed or not in PATH. Please install FFmpeg.")
             raise RuntimeError("FFmpeg is required but not installed")
+        
+        cls._ffmpeg_checked = True
+
+    @contextlib.contextmanager
+    def _atomic_output(self, output_path: str, scratch_dir: Optional[str] = None) -> Iterator[str]:
+        """
+        Yield a temporary path to write to, and move it to output_path only if the block succeeds.
+        
+        An aborted run then never leaves a partial file at output_path. The
+        temporary name keeps the extension, so FFmpeg still infers the format.
+        """
+        base, ext = os.path.splitext(os.path.basename(output_path))
+        directory = scratch_dir or os.path.dirname(output_path) or '.'
+        fd, partial_path = tempfile.mkstemp(prefix=f".{base}.", suffix=f".part{ext}", dir=directory)
+        os.close(fd)
+        
+        # mkstemp creates the file owner-only, and FFmpeg keeps the mode when
+        # it overwrites it, so give it the mode output_path has or would get
+        try:
+            mode = os.stat(output_path).st_mode & 0o7777
+        except OSError:
+            mode = OUTPUT_FILE_MODE
+        os.chmod(partial_path, mode)
+        
+        try:
+            yield partial_path
+        except BaseException:
+            os.remove(partial_path)
+            raise
+        
+        try:
+            os.replace(partial_path, output_path)
+        except OSError as e:
+            # The scratch directory may be on another filesystem
+            if e.errno != errno.EXDEV:
+                os.remove(partial_path)
+                raise
+            shutil.move(partial_path, output_path)
+
+    def _probe_encoders(self) -> Set[str]:
+        """List the encoders compiled into FFmpeg."""
+        result = subprocess.run(['ffmpeg', '-hide_banner', '-encoders'],
+                                check=True, capture_output=True, text=True)
+        
+        encoders = set()
+        for line in result.stdout.splitlines():
+            # Encoder lines look like " V....D libx264   libx264 H.264 / AVC ..."
+            parts = line.split()
+            if len(parts) >= 2 and len(parts[0]) == 6 and parts[0][0] in 'VAS':
+                encoders.add(parts[1])
+        return encoders
+
+    def _available_encoders(self) -> Set[str]:
+        """Return the encoders compiled into FFmpeg, probing once."""
+        if self._encoders is None:
+            try:
+                self._encoders = self._probe_encoders()
+            except (subprocess.SubprocessError, OSError) as e:
+                logger.warning(f"Could not probe FFmpeg encoders: {str(e)}")
+                self._encoders = set()
+        return self._encoders
+
+    def _encoder_works(self, encoder: str) -> bool:
+        """Check that an encoder opens, since builds list hardware encoders whether or not the hardware exists."""
+        cmd = ['ffmpeg', '-hide_banner', '-v', 'error',
+               '-f', 'lavfi', '-i', 'color=size=256x256:duration=0.1']
+        if encoder == 'h264_vaapi':
+            cmd.extend(['-vaapi_device', VAAPI_DEVICE, '-vf', 'format=nv12,hwupload'])
+        cmd.extend(['-frames:v', '1', '-c:v', encoder, '-f', 'null', '-'])
+        return subprocess.run(cmd, capture_output=True).returncode == 0
 
-    def get_video_info(self, video_path: str) -> Dict[str, Any]:
+    def pick_h264_encoder(self) -> str:
+        """
+        Pick the fastest working H.264 encoder.
+        
+        Hardware encoders are tried in the order of HARDWARE_H264_ENCODERS; if
+        none of them works, libx264 is used. The result is cached.
+        
+        Returns:
+            FFmpeg encoder name
+        """
+        if self._h264_encoder is None:
+            self._h264_encoder = 'libx264'
+            available = self._available_encoders()
+            for encoder in HARDWARE_H264_ENCODERS:
+                if encoder in available and self._encoder_works(encoder):
+                    self._h264_encoder = encoder
+                    break
+            
+            logger.info(f"Using H.264 encoder: {self._h264_encoder}")
+        
+        return self._h264_encoder
+
+    def _available_hwaccels(self) -> Set[str]:
+        """Return the hardware acceleration methods FFmpeg supports, probing once."""
+        if self._hwaccels is None:
+            try:
+                output = subprocess.run(['ffmpeg', '-hide_banner', '-hwaccels'],
+                                        check=True, capture_output=True, text=True).stdout
+                # Skip the "Hardware acceleration methods:" header
+                self._hwaccels = {line.strip() for line in output.splitlines()[1:] if line.strip()}
+            except (subprocess.SubprocessError, OSError) as e:
+                logger.warning(f"Could not probe FFmpeg hardware acceleration: {str(e)}")
+                self._hwaccels = set()
+        return self._hwaccels
+
+    def _check_hwaccel(self, hwaccel: str):
+        """Raise ValueError unless hwaccel is a known method that FFmpeg supports."""
+        if hwaccel not in HWACCEL_PROFILES:
+            raise ValueError(f"Unsupported hardware acceleration: {hwaccel} "
+                             f"(choose from {', '.join(HWACCEL_PROFILES)})")
+        if hwaccel not in self._available_hwaccels():
+            raise ValueError(f"FFmpeg does not support {hwaccel} hardware acceleration")
+
+    def _cuda_pipeline_available(self) -> bool:
+        """Check once whether FFmpeg has CUDA decoding and the scale_cuda filter."""
+        if self._cuda_pipeline is None:
+            try:
+                filters = subprocess.run(['ffmpeg', '-hide_banner', '-filters'],
+                                         check=True, capture_output=True, text=True).stdout.split()
+                self._cuda_pipeline = 'cuda' in self._available_hwaccels() and 'scale_cuda' in filters
+            except (subprocess.SubprocessError, OSError) as e:
+                logger.warning(f"Could not probe FFmpeg filters: {str(e)}")
+                self._cuda_pipeline = False
+        return self._cuda_pipeline
+
+    def pick_encoder(self, target: str = "analysis") -> str:
+        """
+        Pick a video encoder for a purpose.
+        
+        Args:
+            target: "analysis" for fast H.264 (see pick_h264_encoder), or "archive"
+                for the best available of ARCHIVE_ENCODERS, falling back to libx264
+            
+        Returns:
+            FFmpeg encoder name
+        """
+        if target == "archive":
+            available = self._available_encoders()
+            for encoder in ARCHIVE_ENCODERS:
+                if encoder in available:
+                    return encoder
+            return 'libx264'
+        
+        return self.pick_h264_encoder()
+
+    def get_video_info(self, video_path: str, full: bool = True) -> Dict[str, Any]:
         """
         Get information about a video file using ffprobe.
         
         Args:
             video_path: Path to the video file
+            full: Return every ffprobe field - if False, only those in PROBE_ENTRIES
             
         Returns:
             Dictionary containing video information
         """
         try:
-            result = subprocess.run([
-                'ffprobe',
-                '-v', 'quiet',
-                '-print_format', 'json',
-                '-show_format',
-                '-show_streams',
-                video_path
-            ], check=True, capture_output=True, text=True)
-            
-            return json.loads(result.stdout)
+            # The probe is cached (in memory, and in probe_cache_dir if set) until
+            # the file's mtime or size changes; the JSON is parsed per call so
+            # callers get their own dictionary
+            stat = os.stat(video_path)
+            output = _probe_video(video_path, stat.st_mtime_ns, stat.st_size,
+                                  None if full else PROBE_ENTRIES, self.probe_cache_dir)
+            return orjson.loads(output) if orjson is not None else json.loads(output)
         
         except subprocess.CalledProcessError as e:
             logger.error(f"FFprobe error: {e.stderr if e.stderr else str(e)}")
@@ -60,6 +422,170 @@ class VideoConverter:
             logger.error(f"Error getting video info: {str(e)}")
             raise
 
+    def _convert_output_args(self,
+                             format: Optional[str] = None,
+                             codec: Optional[str] = None,
+                             width: Optional[int] = None,
+                             height: Optional[int] = None,
+                             fps: Optional[float] = None,
+                             bitrate: Optional[str] = None,
+                             preset: str = "medium",
+                             crf: Optional[int] = None,
+                             audio_codec: Optional[str] = None,
+                             audio_bitrate: Optional[str] = None,
+                             extra_options: Optional[List[str]] = None,
+                             threads: Optional[int] = None,
+                             scaler: Optional[str] = None,
+                             hwaccel: Optional[str] = None,
+                             pix_fmt: Optional[str] = None) -> List[str]:
+        """
+        Build the FFmpeg output options for a conversion (see convert_video for the arguments).
+        
+        pix_fmt sets the output pixel format, in place of the 4:2:0 conversion
+        added for YUV420_ENCODERS; so does a -pix_fmt in extra_options.
+        """
+        args = []
+        profile = HWACCEL_PROFILES[hwaccel] if hwaccel else None
+        
+        # With hardware acceleration, H.264 and HEVC go to the device's encoder
+        if profile:
+            if codec in (None, 'libx264', 'h264'):
+                codec = profile['h264']
+            elif codec in ('libx265', 'hevc'):
+                codec = profile['hevc']
+        
+        # Video codec
+        if codec:
+            args.extend(['-c:v', codec])
+        
+        # Pixel format chosen by the caller
+        if pix_fmt:
+            args.extend(['-pix_fmt', pix_fmt])
+        
+        # Size, frame rate and pixel format go into one filter chain
+        filters = []
+        
+        # Frames for the encoder's device are uploaded before filtering
+        if profile and profile['upload']:
+            filters.append(profile['upload'])
+        
+        # Video size, scaled on the device when it has a scale filter
+        if width and height:
+            if profile and profile['scale']:
+                filters.append(f"{profile['scale']}={width}:{height}")
+            elif scaler:
+                filters.append(f'scale={width}:{height}:flags={scaler}')
+            else:
+                filters.append(f'scale={width}:{height}')
+        
+        # Frame rate
+        if fps:
+            filters.append(f'fps={fps}')
+        
+        # 4:2:0 output, which is what players and H.264 High profile expect,
+        # unless the caller asked for a pixel format
+        if codec in YUV420_ENCODERS and not pix_fmt and '-pix_fmt' not in (extra_options or []):
+            filters.append('format=yuv420p')
+        
+        if filters:
+            args.extend(['-vf', ','.join(filters)])
+        
+        # Bitrate
+        if bitrate:
+            args.extend(['-b:v', bitrate])
+        
+        # Preset (x264 and x265 share the same preset names)
+        if preset and codec and ('x264' in codec or 'x265' in codec):
+            args.extend(['-preset', preset])
+        
+        # CRF (for x264 and x265)
+        if crf is not None and codec and ('x264' in codec or 'x265' in codec):
+            args.extend(['-crf', str(crf)])
+        
+        # Hardware encoders have their own preset names and quality option
+        if profile:
+            if preset and codec.endswith('_nvenc'):
+                args.extend(['-preset', NVENC_PRESETS.get(preset, 'p4')])
+            elif preset in QSV_PRESETS and codec.endswith('_qsv'):
+                args.extend(['-preset', preset])
+            if crf is not None and profile['quality']:
+                args.extend([profile['quality'], str(crf)])
+        
+        # Audio codec
+        if audio_codec:
+            args.extend(['-c:a', audio_codec])
+        
+        # Audio bitrate
+        if audio_bitrate:
+            args.extend(['-b:a', audio_bitrate])
+        
+        # Thread count for the encoder and filters
+        if threads:
+            args.extend(['-threads', str(threads), '-filter_threads', str(threads)])
+        
+        # Extra options
+        if extra_options:
+            args.extend(extra_options)
+        
+        # Output format
+        if format:
+            args.extend(['-f', format])
+        
+        return args
+
+    def convert_spec(self,
+                     format: Optional[str] = None,
+                     codec: Optional[str] = None,
+                     width: Optional[int] = None,
+                     height: Optional[int] = None,
+                     fps: Optional[float] = None,
+                     bitrate: Optional[str] = None,
+                     preset: str = "medium",
+                     crf: Optional[int] = None,
+                     audio_codec: Optional[str] = None,
+                     audio_bitrate: Optional[str] = None,
+                     extra_options: Optional[List[str]] = None,
+                     threads: Optional[int] = None,
+                     scaler: Optional[str] = None,
+                     hwaccel: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Build the FFmpeg options for a conversion once, for reuse with convert_video.
+        
+        The options depend only on the settings, not on the file, so a batch
+        can build them (and check the hardware acceleration method) up front
+        and hand the same spec to every convert_video call or worker.
+        
+        Args:
+            See convert_video
+            
+        Returns:
+            Dictionary with the FFmpeg input options ("input_options") and
+            output options ("args")
+        """
+        input_options = []
+        if hwaccel:
+            self._check_hwaccel(hwaccel)
+            input_options = list(HWACCEL_PROFILES[hwaccel]['input_options'])
+        
+        args = self._convert_output_args(
+            format=format,
+            codec=codec,
+            width=width,
+            height=height,
+            fps=fps,
+            bitrate=bitrate,
+            preset=preset,
+            crf=crf,
+            audio_codec=audio_codec,
+            audio_bitrate=audio_bitrate,
+            extra_options=extra_options,
+            threads=threads,
+            scaler=scaler,
+            hwaccel=hwaccel
+        )
+        
+        return {"input_options": input_options, "args": args}
+
     def convert_video(self, 
                      input_path: str, 
                      output_path: str, 
@@ -73,7 +599,13 @@ class VideoConverter:
                      crf: Optional[int] = None,
                      audio_codec: Optional[str] = None,
                      audio_bitrate: Optional[str] = None,
-                     extra_options: Optional[List[str]] = None) -> str:
+                     extra_options: Optional[List[str]] = None,
+                     threads: Optional[int] = None,
+                     scaler: Optional[str] = None,
+                     scratch_dir: Optional[str] = None,
+                     input_options: Optional[List[str]] = None,
+                     hwaccel: Optional[str] = None,
+                     spec: Optional[Dict[str, Any]] = None) -> str:
         """
         Convert a video file to a different format or with different parameters.
         
@@ -91,66 +623,59 @@ class VideoConverter:
             audio_codec: Audio codec to use - if None, determined by format
             audio_bitrate: Audio bitrate (e.g., "128k") - if None, determined by codec
             extra_options: List of extra FFmpeg options
+            threads: Number of encoder and filter threads - if None, FFmpeg decides
+            scaler: Scaling algorithm (fast_bilinear, area, etc.) - if None, FFmpeg's default
+            scratch_dir: Directory for the partial output (e.g. /dev/shm) - if None,
+                next to output_path
+            input_options: List of FFmpeg options for the input (e.g. -hwaccel)
+            hwaccel: Hardware acceleration method (cuda, vaapi, qsv, videotoolbox) -
+                decodes on the device where supported and encodes H.264/HEVC there
+            spec: Options prebuilt by convert_spec, e.g. once for a whole batch -
+                if given, the encoding arguments above are not used
             
         Returns:
             Path to the output video file
         """
         try:
             # Get information about the input video
-            video_info = self.get_video_info(input_path)
+            video_info = self.get_video_info(input_path, full=False)
             
-            # Build FFmpeg command
-            cmd = ['ffmpeg', '-i', input_path]
+            if spec is None:
+                spec = self.convert_spec(
+                    format=format,
+                    codec=codec,
+                    width=width,
+                    height=height,
+                    fps=fps,
+                    bitrate=bitrate,
+                    preset=preset,
+                    crf=crf,
+                    audio_codec=audio_codec,
+                    audio_bitrate=audio_bitrate,
+                    extra_options=extra_options,
+                    threads=threads,
+                    scaler=scaler,
+                    hwaccel=hwaccel
+                )
             
-            # Video codec
-            if codec:
-                cmd.extend(['-c:v', codec])
-            
-            # Video size
-            if width and height:
-                cmd.extend(['-s', f'{width}x{height}'])
-            
-            # Frame rate
-            if fps:
-                cmd.extend(['-r', str(fps)])
-            
-            # Bitrate
-            if bitrate:
-                cmd.extend(['-b:v', bitrate])
-            
-            # Preset (for x264 and some other codecs)
-            if preset and codec and 'x264' in codec:
-                cmd.extend(['-preset', preset])
-            
-            # CRF (for x264 and some other codecs)
-            if crf is not None and codec and 'x264' in codec:
-                cmd.extend(['-crf', str(crf)])
-            
-            # Audio codec
-            if audio_codec:
-                cmd.extend(['-c:a', audio_codec])
-            
-            # Audio bitrate
-            if audio_bitrate:
-                cmd.extend(['-b:a', audio_bitrate])
-            
-            # Extra options
-            if extra_options:
-                cmd.extend(extra_options)
-            
-            # Output format
-            if format:
-                cmd.extend(['-f', format])
+            # Build FFmpeg command
+            cmd = ['ffmpeg', *FFMPEG_QUIET_OPTIONS, *spec["input_options"], *(input_options or []),
+                   '-i', input_path, *spec["args"]]
             
             # Always overwrite
             cmd.extend(['-y'])
             
-            # Output file
-            cmd.append(output_path)
+            with self._atomic_output(output_path, scratch_dir) as partial_path:
+                # Output file
+                cmd.append(partial_path)
+                
+                # Execute the command
+                _log_command(cmd)
+                result = subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
             
-            # Execute the command
-            logger.info(f"Running FFmpeg command: {' '.join(cmd)}")
-            result = subprocess.run(cmd, check=True, capture_output=True)
+            if self.drop_page_cache:
+                _drop_cache(input_path)
+                _drop_cache(output_path, sync=True)
             
             logger.info(f"Video conversion complete: {output_path}")
             return output_path
@@ -162,10 +687,157 @@ class VideoConverter:
             logger.error(f"Error converting video: {str(e)}")
             raise
 
+    def _optimize_settings(self,
+                           input_path: str,
+                           max_dimension: int,
+                           preset: str,
+                           use_hardware: bool = True,
+                           quality: str = "analysis",
+                           gpu_decode: bool = False,
+                           hwaccel: Optional[str] = None) -> Dict[str, Any]:
+        """Work out the convert_video settings that optimize_for_analysis uses for a video."""
+        # Get information about the input video
+        video_info = self.get_video_info(input_path, full=False)
+        
+        # Find video stream
+        video_stream = None
+        for stream in video_info.get('streams', []):
+            if stream.get('codec_type') == 'video':
+                video_stream = stream
+                break
+        
+        if not video_stream:
+            raise ValueError("No video stream found in the input file")
+        
+        # Get original dimensions
+        width = int(video_stream.get('width', 0))
+        height = int(video_stream.get('height', 0))
+        
+        # Calculate new dimensions maintaining aspect ratio
+        if width > height and width > max_dimension:
+            new_width = max_dimension
+            new_height = int(height * (max_dimension / width))
+        elif height > width and height > max_dimension:
+            new_height = max_dimension
+            new_width = int(width * (max_dimension / height))
+        else:
+            # No resizing needed
+            new_width = width
+            new_height = height
+        
+        # H.264 4:2:0 input at no more than 30fps can be stream-copied when it
+        # keeps its size, so only then is a video slightly over the limit left
+        # at its size. Anything that is re-encoded anyway is resized as asked
+        copy_candidate = (quality == "analysis" and video_stream.get('codec_name') == 'h264'
+                          and video_stream.get('pix_fmt') in ('yuv420p', 'yuvj420p')
+                          and 0.0 < _parse_frame_rate(video_stream.get('avg_frame_rate')) <= 30.0)
+        if (copy_candidate and new_width >= width * (1 - RESIZE_TOLERANCE)
+                and new_height >= height * (1 - RESIZE_TOLERANCE)):
+            new_width = width
+            new_height = height
+        
+        if (new_width, new_height) != (width, height):
+            # Resized output snaps to whole 16x16 macroblocks. The clamp can
+            # leave a size that is not one (or is odd) when max_dimension is,
+            # so round down again, to an even size below 16
+            new_width = min(max(16, round(new_width / 16) * 16), max_dimension)
+            new_height = min(max(16, round(new_height / 16) * 16), max_dimension)
+            new_width = new_width // 16 * 16 or max(2, new_width & ~1)
+            new_height = new_height // 16 * 16 or max(2, new_height & ~1)
+        else:
+            # H.264 with 4:2:0 chroma needs even dimensions
+            new_width -= new_width & 1
+            new_height -= new_height & 1
+        
+        # Audio that is already AAC (or absent) can be copied as-is
+        audio_codecs = [stream.get('codec_name') for stream in video_info.get('streams', [])
+                        if stream.get('codec_type') == 'audio']
+        if all(codec == 'aac' for codec in audio_codecs):
+            audio_settings = {"audio_codec": "copy"}
+        else:
+            audio_settings = {"audio_codec": "aac", "audio_bitrate": "128k"}
+        
+        # Input that is already H.264 at the target size and frame rate is
+        # copied without re-encoding the video
+        if copy_candidate and new_width == width and new_height == height:
+            return {"codec": "copy", **audio_settings}
+        
+        settings = {
+            "codec": "libx264",
+            "width": new_width,
+            "height": new_height,
+            "fps": 30.0,  # Standard frame rate for analysis
+            "crf": 23,    # Good quality/size balance
+            "preset": preset,
+            "scaler": "fast_bilinear",  # Plenty for analysis and much cheaper than bicubic
+            **audio_settings
+        }
+        
+        if quality == "archive":
+            # Smaller files from a slower software encoder
+            encoder = self.pick_encoder("archive")
+            if encoder == 'libsvtav1':
+                settings.update({"codec": encoder, "crf": None, "extra_options": ['-preset', '8', '-crf', '30']})
+            elif encoder == 'libx265':
+                settings.update({"codec": encoder, "crf": 28, "extra_options": ['-tag:v', 'hvc1']})
+            return settings
+        
+        # An explicit acceleration method replaces the automatic encoder choice
+        if hwaccel:
+            settings["hwaccel"] = hwaccel
+            return settings
+        
+        encoder = self.pick_h264_encoder() if use_hardware else 'libx264'
+        if encoder != 'libx264':
+            # Hardware encoders have their own quality controls instead of CRF
+            settings.update({"codec": encoder, "crf": None})
+            if encoder == 'h264_nvenc':
+                settings["extra_options"] = ['-cq', '23', '-preset', 'p4', '-rc', 'vbr']
+                if (gpu_decode and video_stream.get('codec_name') in NVDEC_CODECS
+                        and self._cuda_pipeline_available()):
+                    # Decode, scale and encode on the GPU, so frames never
+                    # cross back to host memory
+                    settings.update({"width": None, "height": None, "fps": None})
+                    settings["input_options"] = ['-hwaccel', 'cuda', '-hwaccel_output_format', 'cuda']
+                    settings["extra_options"] = [
+                        '-vf', f'fps=30.0,scale_cuda={new_width}:{new_height}',
+                        *settings["extra_options"]
+                    ]
+            elif encoder == 'h264_qsv':
+                settings["extra_options"] = ['-global_quality', '23']
+            elif encoder == 'h264_vaapi':
+                # Frames are uploaded to the GPU and scaled there, so the whole
+                # filter chain is given here
+                settings.update({"width": None, "height": None, "fps": None})
+                settings["extra_options"] = [
+                    '-vaapi_device', VAAPI_DEVICE,
+                    '-vf', f'fps=30.0,format=nv12,hwupload,scale_vaapi=w={new_width}:h={new_height}',
+                    '-qp', '23'
+                ]
+                if gpu_decode:
+                    # Decode on the GPU as well, so full-size frames never reach
+                    # host memory. Codecs the GPU cannot decode fall back to
+                    # software frames, which hwupload then takes as before
+                    settings["input_options"] = list(HWACCEL_PROFILES['vaapi']['input_options'])
+                    settings["extra_options"] = [
+                        '-vf', f'fps=30.0,{HWACCEL_PROFILES["vaapi"]["upload"]},'
+                               f'scale_vaapi=w={new_width}:h={new_height}',
+                        '-qp', '23'
+                    ]
+            else:
+                settings["bitrate"] = "4000k"
+        
+        return settings
+
     def optimize_for_analysis(self, 
                              input_path: str, 
                              output_path: Optional[str] = None, 
-                             max_dimension: int = 1280) -> str:
+                             max_dimension: int = 1280,
+                             preset: str = "faster",
+                             threads: Optional[int] = None,
+                             use_hardware: bool = True,
+                             quality: str = "analysis",
+                             hwaccel: Optional[str] = None) -> str:
         """
         Optimize a video for analysis with Pyunto Intelligence.
         
@@ -173,39 +845,21 @@ class VideoConverter:
             input_path: Path to the input video file
             output_path: Path for the output video file - if None, creates one based on input
             max_dimension: Maximum width or height in pixels
+            preset: x264 encoding preset - "faster" encodes several times quicker than
+                "medium" at nearly the same quality, which is plenty for analysis input
+            threads: Number of encoder and filter threads - if None, FFmpeg decides
+            use_hardware: Use a hardware H.264 encoder when one is available
+            quality: "analysis" for a fast H.264 copy, or "archive" for a smaller
+                SVT-AV1 or x265 encode when FFmpeg has one
+            hwaccel: Hardware acceleration method to use instead of the automatic
+                encoder choice (cuda, vaapi, qsv, videotoolbox)
             
         Returns:
             Path to the optimized video file
         """
         try:
-            # Get information about the input video
-            video_info = self.get_video_info(input_path)
-            
-            # Find video stream
-            video_stream = None
-            for stream in video_info.get('streams', []):
-                if stream.get('codec_type') == 'video':
-                    video_stream = stream
-                    break
-            
-            if not video_stream:
-                raise ValueError("No video stream found in the input file")
-            
-            # Get original dimensions
-            width = int(video_stream.get('width', 0))
-            height = int(video_stream.get('height', 0))
-            
-            # Calculate new dimensions maintaining aspect ratio
-            if width > height and width > max_dimension:
-                new_width = max_dimension
-                new_height = int(height * (max_dimension / width))
-            elif height > width and height > max_dimension:
-                new_height = max_dimension
-                new_width = int(width * (max_dimension / height))
-            else:
-                # No resizing needed
-                new_width = width
-                new_height = height
+            settings = self._optimize_settings(input_path, max_dimension, preset, use_hardware, quality,
+                                               gpu_decode=True, hwaccel=hwaccel)
             
             # Generate output path if not provided
             if not output_path:
@@ -216,26 +870,393 @@ class VideoConverter:
             return self.convert_video(
                 input_path=input_path,
                 output_path=output_path,
-                codec="libx264",
-                width=new_width,
-                height=new_height,
-                fps=30.0,  # Standard frame rate for analysis
-                crf=23,    # Good quality/size balance
-                preset="medium",
-                audio_codec="aac",
-                audio_bitrate="128k"
+                threads=threads,
+                **settings
             )
             
         except Exception as e:
             logger.error(f"Error optimizing video: {str(e)}")
             raise
 
+    def encode_from_frames(self,
+                           frames: Iterable[Any],
+                           output_path: str,
+                           width: int,
+                           height: int,
+                           fps: float,
+                           pix_fmt: str = "rgb24",
+                           codec: str = "libx264",
+                           preset: str = "medium",
+                           crf: Optional[int] = 23,
+                           output_pix_fmt: Optional[str] = "yuv420p",
+                           extra_options: Optional[List[str]] = None) -> str:
+        """
+        Encode decoded frames straight from memory, without an intermediate video file.
+        
+        Frames are piped to FFmpeg as raw video, so there is no container to write
+        and decode again. Pass a generator to keep memory bounded.
+        
+        Args:
+            frames: Iterable of frames - NumPy arrays (height x width x channels)
+                or bytes-like objects in pix_fmt layout
+            output_path: Path for the output video file
+            width: Frame width in pixels
+            height: Frame height in pixels
+            fps: Frame rate
+            pix_fmt: Pixel format of the input frames (rgb24, bgr24 for OpenCV, etc.)
+            codec: Video codec to use
+            preset: Encoding preset (slower = better quality) - options depend on codec
+            crf: Constant Rate Factor (0-51, lower = better quality)
+            output_pix_fmt: Pixel format of the encoded video - if None, chosen by the codec
+            extra_options: List of extra FFmpeg options
+            
+        Returns:
+            Path to the output video file
+        """
+        cmd = [
+            'ffmpeg', *FFMPEG_QUIET_OPTIONS,
+            '-f', 'rawvideo',
+            '-pix_fmt', pix_fmt,
+            '-s', f'{width}x{height}',
+            '-r', str(fps),
+            '-i', '-'
+        ]
+        cmd.extend(self._convert_output_args(codec=codec, preset=preset, crf=crf, extra_options=extra_options,
+                                             pix_fmt=output_pix_fmt))
+        cmd.extend(['-y', output_path])
+        
+        process = None
+        try:
+            _log_command(cmd)
+            process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=1 << 20)
+            
+            try:
+                for frame in frames:
+                    data = memoryview(frame)
+                    if not data.c_contiguous:
+                        data = memoryview(data.tobytes())
+                    process.stdin.write(data.cast('B'))
+            except BrokenPipeError:
+                # FFmpeg exited early; its error is reported below
+                pass
+            finally:
+                try:
+                    process.stdin.close()
+                except BrokenPipeError:
+                    pass
+            
+            stderr = process.stderr.read()
+            process.wait()
+            if process.returncode != 0:
+                raise subprocess.CalledProcessError(process.returncode, cmd, stderr=stderr)
+            
+            logger.info(f"Video encoding complete: {output_path}")
+            return output_path
+            
+        except subprocess.CalledProcessError as e:
+            logger.error(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
+            raise
+        except Exception as e:
+            if process is not None and process.poll() is None:
+                process.kill()
+            logger.error(f"Error encoding frames: {str(e)}")
+            raise
+
+    def batch_convert(self,
+                      jobs: List[Dict[str, Any]],
+                      max_workers: Optional[int] = None,
+                      threads_per_job: int = 4) -> List[str]:
+        """
+        Run several conversions concurrently, each in its own process.
+        
+        At low resolutions one FFmpeg process cannot keep many cores busy, so a
+        few small encodes side by side finish sooner than one large one.
+        
+        Args:
+            jobs: List of keyword arguments for convert_video - a job with
+                "operation": "optimize" is passed to optimize_for_analysis instead
+            max_workers: Number of concurrent jobs - if None, CPU count / threads_per_job
+            threads_per_job: Thread count given to each job that does not set its own
+            
+        Returns:
+            List of output paths, in the order of jobs
+        """
+        if max_workers is None:
+            max_workers = max(1, (os.cpu_count() or 1) // threads_per_job)
+        
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = []
+                for job in jobs:
+                    job = dict(job)
+                    operation = job.pop("operation", "convert")
+                    job.setdefault("threads", threads_per_job)
+                    if operation == "optimize":
+                        futures.append(executor.submit(self.optimize_for_analysis, **job))
+                    else:
+                        futures.append(executor.submit(self.convert_video, **job))
+                
+                return [future.result() for future in futures]
+                
+        except Exception as e:
+            logger.error(f"Error in batch conversion: {str(e)}")
+            raise
+
+    def parallel_transcode(self,
+                           input_path: str,
+                           output_path: str,
+                           segment_seconds: float = 10.0,
+                           workers: Optional[int] = None,
+                           progress_callback: Optional[Callable[[int, int], None]] = None,
+                           **encode_options) -> str:
+        """
+        Transcode a long video by encoding segments of it in parallel.
+        
+        Each worker seeks to its own segment of the input and encodes only the
+        video. The segments are then joined with -c copy, and the audio is
+        encoded once from the original so there are no gaps at the joins.
+        
+        Args:
+            input_path: Path to the input video file
+            output_path: Path for the output video file
+            segment_seconds: Length of each segment in seconds
+            workers: Number of concurrent encodes - if None, CPU count
+            progress_callback: Called with (segments done, total segments) as segments finish
+            **encode_options: Options for convert_video (codec, width, height, fps, crf, ...) -
+                audio_codec and audio_bitrate apply to the final audio encode
+            
+        Returns:
+            Path to the output video file
+        """
+        try:
+            duration = float(self.get_video_info(input_path, full=False).get('format', {}).get('duration', 0))
+            if duration <= 0:
+                raise ValueError("Could not determine the duration of the input video")
+            
+            audio_codec = encode_options.pop('audio_codec', None) or 'aac'
+            audio_bitrate = encode_options.pop('audio_bitrate', None)
+            extra_options = [*(encode_options.pop('extra_options', None) or []), '-an']
+            workers = workers or os.cpu_count() or 1
+            encode_options.setdefault('threads', max(1, (os.cpu_count() or 1) // workers))
+            segment_count = math.ceil(duration / segment_seconds)
+            
+            with tempfile.TemporaryDirectory(prefix="pyunto_segments_") as segment_dir:
+                segment_paths = [os.path.join(segment_dir, f"segment_{i:05d}.mkv")
+                                 for i in range(segment_count)]
+                
+                # Encode the video of each segment, seeking on the input
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    futures = [
+                        executor.submit(
+                            self.convert_video,
+                            input_path=input_path,
+                            output_path=segment_path,
+                            input_options=['-ss', str(i * segment_seconds), '-t', str(segment_seconds)],
+                            extra_options=extra_options,
+                            **encode_options
+                        )
+                        for i, segment_path in enumerate(segment_paths)
+                    ]
+                    for done, future in enumerate(as_completed(futures), 1):
+                        future.result()
+                        if progress_callback:
+                            progress_callback(done, segment_count)
+                
+                # Join the segments and add the audio from the original
+                cmd = [
+                    'ffmpeg', *FFMPEG_QUIET_OPTIONS,
+                    '-f', 'concat', '-safe', '0', '-protocol_whitelist', 'file,pipe', '-i', 'pipe:0',
+                    '-i', input_path,
+                    '-map', '0:v', '-map', '1:a?',
+                    '-c:v', 'copy',
+                    '-c:a', audio_codec
+                ]
+                if audio_bitrate:
+                    cmd.extend(['-b:a', audio_bitrate])
+                
+                with self._atomic_output(output_path) as partial_path:
+                    cmd.extend(['-y', partial_path])
+                    
+                    # Execute the command
+                    _log_command(cmd)
+                    subprocess.run(cmd, input=_concat_list(segment_paths), check=True,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            
+            logger.info(f"Parallel transcode complete: {output_path} ({segment_count} segments)")
+            return output_path
+            
+        except subprocess.CalledProcessError as e:
+            logger.error(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
+            raise
+        except Exception as e:
+            logger.error(f"Error in parallel transcode: {str(e)}")
+            raise
+
+    def thumbnail_output_spec(self,
+                              video_path: str,
+                              output_path: Optional[str] = None,
+                              time_offset: float = 0.0,
+                              width: Optional[int] = None,
+                              height: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Build the output spec for a thumbnail, for use with multi_output.
+        
+        Args:
+            video_path: Path to the video file
+            output_path: Path for the thumbnail image - if None, creates one based on input
+            time_offset: Time in seconds to extract frame from
+            width: Output width in pixels - if None, same as video
+            height: Output height in pixels - if None, same as video
+            
+        Returns:
+            Dictionary with the seek position ("seek"), FFmpeg output options ("args")
+            and output path ("path")
+        """
+        # Generate output path if not provided
+        if not output_path:
+            base, ext = os.path.splitext(video_path)
+            output_path = f"{base}_thumbnail.jpg"
+        
+        args = []
+        
+        # Set size if specified
+        if width and height:
+            args.extend(['-s', f'{width}x{height}'])
+        
+        # Set frame selection and output options
+        args.extend([
+            '-frames:v', '1',  # Extract only one frame
+            '-q:v', '2'        # High quality JPEG
+        ])
+        
+        return {"seek": time_offset, "args": args, "path": output_path}
+
+    def optimize_output_spec(self,
+                             input_path: str,
+                             output_path: Optional[str] = None,
+                             max_dimension: int = 1280,
+                             preset: str = "faster",
+                             use_hardware: bool = True,
+                             quality: str = "analysis") -> Dict[str, Any]:
+        """
+        Build the output spec for an analysis-optimized copy, for use with multi_output.
+        
+        Args:
+            input_path: Path to the input video file
+            output_path: Path for the output video file - if None, creates one based on input
+            max_dimension: Maximum width or height in pixels
+            preset: x264 encoding preset
+            use_hardware: Use a hardware H.264 encoder when one is available
+            quality: "analysis" or "archive", as for optimize_for_analysis
+            
+        Returns:
+            Dictionary with the FFmpeg output options ("args") and output path ("path")
+        """
+        # Generate output path if not provided
+        if not output_path:
+            base, ext = os.path.splitext(input_path)
+            output_path = f"{base}_optimized.mp4"
+        
+        settings = self._optimize_settings(input_path, max_dimension, preset, use_hardware, quality)
+        return {"args": self._convert_output_args(**settings), "path": output_path}
+
+    def trim_output_spec(self,
+                         output_path: str,
+                         start_time: float,
+                         duration: Optional[float] = None,
+                         end_time: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Build the output spec for a trimmed copy, for use with multi_output.
+        
+        Args:
+            output_path: Path for the output video file
+            start_time: Start time in seconds
+            duration: Duration in seconds - if None, uses end_time
+            end_time: End time in seconds - if None, uses duration
+            
+        Returns:
+            Dictionary with the seek position ("seek"), FFmpeg output options ("args")
+            and output path ("path"), marked to seek on the input ("input_seek")
+        """
+        args = []
+        
+        # Add duration (an end time becomes a duration, since it would otherwise
+        # be measured from the seek point when seeking on the input)
+        if duration is not None:
+            args.extend(['-t', str(duration)])
+        elif end_time is not None:
+            args.extend(['-t', str(end_time - start_time)])
+        
+        # Copy streams without re-encoding for speed, starting timestamps at zero
+        args.extend(['-c', 'copy', '-avoid_negative_ts', 'make_zero'])
+        
+        # A stream copy can only start at a keyframe, so the seek has to be on
+        # the input; an output seek would drop video up to the next keyframe
+        return {"seek": start_time, "args": args, "path": output_path, "input_seek": True}
+
+    def multi_output(self, input_path: str, outputs: List[Dict[str, Any]]) -> List[str]:
+        """
+        Write several outputs from a single FFmpeg run.
+        
+        The input is demuxed and decoded once and shared by every output, instead
+        of once per operation. Outputs marked "input_seek" (stream-copy trims)
+        need a seek on their own input, so each gets its own FFmpeg run; all
+        outputs are still only moved into place once every run has succeeded.
+        
+        Args:
+            input_path: Path to the input video file
+            outputs: Output specs from thumbnail_output_spec, optimize_output_spec
+                and trim_output_spec
+            
+        Returns:
+            List of output paths, in the order given
+        """
+        try:
+            with contextlib.ExitStack() as stack:
+                # Build commands
+                shared_cmd = ['ffmpeg', *FFMPEG_QUIET_OPTIONS, '-i', input_path, '-y']
+                commands = []
+                shared_count = 0
+                for output in outputs:
+                    partial_path = stack.enter_context(self._atomic_output(output["path"]))
+                    if output.get("input_seek"):
+                        commands.append(['ffmpeg', *FFMPEG_QUIET_OPTIONS, '-ss', str(output["seek"]),
+                                         '-i', input_path, *output["args"], '-y', partial_path])
+                        continue
+                    
+                    # Seeks are per output here, as the input is shared
+                    if output.get("seek") is not None:
+                        shared_cmd.extend(['-ss', str(output["seek"])])
+                    shared_cmd.extend(output["args"])
+                    shared_cmd.append(partial_path)
+                    shared_count += 1
+                
+                if shared_count:
+                    commands.insert(0, shared_cmd)
+                
+                # Execute the commands
+                for cmd in commands:
+                    _log_command(cmd)
+                    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            
+            output_paths = [output["path"] for output in outputs]
+            logger.info(f"Outputs written: {', '.join(output_paths)}")
+            return output_paths
+            
+        except subprocess.CalledProcessError as e:
+            logger.error(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
+            raise
+        except Exception as e:
+            logger.error(f"Error writing outputs: {str(e)}")
+            raise
+
     def extract_thumbnail(self, 
                          video_path: str, 
                          output_path: Optional[str] = None,
                          time_offset: float = 0.0,
                          width: Optional[int] = None,
-                         height: Optional[int] = None) -> str:
+                         height: Optional[int] = None,
+                         scratch_dir: Optional[str] = None) -> str:
         """
         Extract a thumbnail image from a video.
         
@@ -245,33 +1266,28 @@ class VideoConverter:
             time_offset: Time in seconds to extract frame from
             width: Output width in pixels - if None, same as video
             height: Output height in pixels - if None, same as video
+            scratch_dir: Directory for the partial output - if None, next to output_path
             
         Returns:
             Path to the thumbnail image
         """
         try:
-            # Generate output path if not provided
-            if not output_path:
-                base, ext = os.path.splitext(video_path)
-                output_path = f"{base}_thumbnail.jpg"
-            
-            # Build command
-            cmd = ['ffmpeg', '-i', video_path, '-ss', str(time_offset)]
+            spec = self.thumbnail_output_spec(video_path, output_path, time_offset, width, height)
+            output_path = spec["path"]
             
-            # Set size if specified
-            if width and height:
-                cmd.extend(['-s', f'{width}x{height}'])
-            
-            # Set frame selection and output options
-            cmd.extend([
-                '-frames:v', '1',  # Extract only one frame
-                '-q:v', '2',       # High quality JPEG
-                '-y',              # Overwrite output
-                output_path
-            ])
+            # Build command, seeking on the input so earlier frames are skipped
+            cmd = ['ffmpeg', *FFMPEG_QUIET_OPTIONS, '-ss', str(spec["seek"]), '-i', video_path]
+            cmd.extend(spec["args"])
             
-            # Execute the command
-            subprocess.run(cmd, check=True, capture_output=True)
+            with self._atomic_output(output_path, scratch_dir) as partial_path:
+                cmd.extend([
+                    '-y',              # Overwrite output
+                    partial_path
+                ])
+                
+                # Execute the command
+                _log_command(cmd)
+                subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
             
             logger.info(f"Thumbnail extracted to: {output_path}")
             return output_path
@@ -283,11 +1299,108 @@ class VideoConverter:
             logger.error(f"Error extracting thumbnail: {str(e)}")
             raise
     
+    def extract_thumbnails(self,
+                           video_path: str,
+                           offsets: List[float],
+                           output_pattern: Optional[str] = None,
+                           width: Optional[int] = None,
+                           height: Optional[int] = None) -> List[str]:
+        """
+        Extract thumbnails at several times in a single FFmpeg pass.
+        
+        Args:
+            video_path: Path to the video file
+            offsets: Times in seconds to extract frames from
+            output_pattern: printf-style path for the images (e.g. "thumb_%03d.jpg") -
+                if None, creates one based on input
+            width: Output width in pixels - if None, same as video
+            height: Output height in pixels - if None, same as video
+            
+        Returns:
+            List of thumbnail paths, in order of time. Offsets past the end of
+            the video, or falling on the same frame as an earlier offset, give
+            no image of their own, so the list can be shorter than offsets and
+            is numbered by image rather than by offset
+        """
+        try:
+            # Generate output pattern if not provided
+            if not output_pattern:
+                base, ext = os.path.splitext(video_path)
+                output_pattern = f"{base}_thumbnail_%03d.jpg"
+            
+            # Seek to the first offset; the select filter then picks the first
+            # frame at or after each remaining offset, relative to that point
+            offsets = sorted(set(offsets))
+            start = offsets[0]
+            select = '+'.join(
+                f'gte(t,{offset - start})*not(gte(prev_t,{offset - start}))'
+                for offset in offsets
+            )
+            filters = [f"select='{select}'"]
+            if width and height:
+                filters.append(f'scale={width}:{height}')
+            
+            # Images are written to a fresh directory next to the output and
+            # moved into place, so files left by an earlier run are never
+            # mistaken for new ones
+            output_dir = os.path.dirname(output_pattern) or '.'
+            with tempfile.TemporaryDirectory(prefix='.thumbnails.', dir=output_dir) as temp_dir:
+                temp_pattern = os.path.join(temp_dir, os.path.basename(output_pattern))
+                
+                # Build command
+                cmd = [
+                    'ffmpeg', *FFMPEG_QUIET_OPTIONS,
+                    '-ss', str(start),
+                    '-i', video_path,
+                    '-vf', ','.join(filters),
+                    '-vsync', 'vfr',                     # One image per selected frame
+                    '-frames:v', str(len(offsets)),      # Stop after the last one
+                    '-q:v', '2',                         # High quality JPEG
+                    '-y',
+                    temp_pattern
+                ]
+                
+                # Execute the command
+                _log_command(cmd)
+                subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+                
+                output_paths = []
+                for i in range(1, len(offsets) + 1):
+                    temp_path = temp_pattern % i
+                    if not os.path.exists(temp_path):
+                        break
+                    os.replace(temp_path, output_pattern % i)
+                    output_paths.append(output_pattern % i)
+            
+            logger.info(f"Extracted {len(output_paths)} thumbnails to: {output_pattern}")
+            return output_paths
+            
+        except subprocess.CalledProcessError as e:
+            logger.error(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
+            raise
+        except Exception as e:
+            logger.error(f"Error extracting thumbnails: {str(e)}")
+            raise
+    
+    def _streams_match(self, input_paths: List[str]) -> bool:
+        """Check whether all inputs have the same stream layout, so they can be joined with -c copy."""
+        layouts = set()
+        for input_path in input_paths:
+            streams = self.get_video_info(input_path, full=False).get('streams', [])
+            layouts.add(tuple(
+                tuple(stream.get(key) for key in CONCAT_STREAM_KEYS)
+                for stream in streams
+                if stream.get('codec_type') in ('video', 'audio')
+            ))
+        return len(layouts) <= 1
+
     def concat_videos(self, 
                      input_paths: List[str], 
                      output_path: str,
                      format: Optional[str] = None,
-                     codec: Optional[str] = None) -> str:
+                     codec: Optional[str] = None,
+                     scratch_dir: Optional[str] = None,
+                     hwaccel: Optional[str] = None) -> str:
         """
         Concatenate multiple videos into a single file.
         
@@ -295,44 +1408,59 @@ class VideoConverter:
             input_paths: List of paths to input video files
             output_path: Path for the output video file
             format: Output container format - if None, inferred from output_path
-            codec: Video codec to use - if None, determined by format
+            codec: Video codec to use - if None, streams are copied when the inputs
+                match and re-encoded with libx264 otherwise
+            scratch_dir: Directory for the partial output - if None, next to output_path
+            hwaccel: Hardware acceleration method for re-encoding (cuda, vaapi, qsv,
+                videotoolbox) - not used when streams are copied
             
         Returns:
             Path to the concatenated video file
         """
         try:
-            # Create a temporary file list
-            list_path = os.path.join(os.path.dirname(output_path), "concat_list.txt")
-            with open(list_path, "w") as f:
-                for input_path in input_paths:
-                    f.write(f"file '{os.path.abspath(input_path)}'\n")
+            # Add codec if specified
+            if codec:
+                codec_args = (self._convert_output_args(codec=codec, hwaccel=hwaccel)
+                              if hwaccel else ['-c:v', codec])
+            elif self._streams_match(input_paths):
+                codec_args = ['-c', 'copy']  # Copy streams when the inputs match
+                hwaccel = None
+            else:
+                logger.warning("Input videos have different stream parameters; re-encoding them")
+                codec_args = self._convert_output_args(codec='libx264', audio_codec='aac', hwaccel=hwaccel)
             
-            # Build command
+            input_options = []
+            if hwaccel:
+                self._check_hwaccel(hwaccel)
+                input_options = HWACCEL_PROFILES[hwaccel]['input_options']
+            
+            # Build command, reading the file list from stdin
             cmd = [
-                'ffmpeg',
+                'ffmpeg', *FFMPEG_QUIET_OPTIONS, *input_options,
                 '-f', 'concat',
                 '-safe', '0',
-                '-i', list_path
+                '-protocol_whitelist', 'file,pipe',
+                '-i', 'pipe:0'
             ]
-            
-            # Add codec if specified
-            if codec:
-                cmd.extend(['-c:v', codec])
-            else:
-                cmd.extend(['-c', 'copy'])  # Copy streams by default
+            cmd.extend(codec_args)
             
             # Add format if specified
             if format:
                 cmd.extend(['-f', format])
             
-            # Add output path
-            cmd.extend(['-y', output_path])
-            
-            # Execute the command
-            subprocess.run(cmd, check=True, capture_output=True)
+            with self._atomic_output(output_path, scratch_dir) as partial_path:
+                # Add output path
+                cmd.extend(['-y', partial_path])
+                
+                # Execute the command
+                _log_command(cmd)
+                subprocess.run(cmd, input=_concat_list(input_paths), check=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
             
-            # Clean up temporary file
-            os.remove(list_path)
+            if self.drop_page_cache:
+                for input_path in input_paths:
+                    _drop_cache(input_path)
+                _drop_cache(output_path, sync=True)
             
             logger.info(f"Videos concatenated to: {output_path}")
             return output_path
@@ -349,7 +1477,8 @@ class VideoConverter:
                   output_path: str,
                   start_time: float,
                   duration: Optional[float] = None,
-                  end_time: Optional[float] = None) -> str:
+                  end_time: Optional[float] = None,
+                  scratch_dir: Optional[str] = None) -> str:
         """
         Trim a video to a specific segment.
         
@@ -359,29 +1488,31 @@ class VideoConverter:
             start_time: Start time in seconds
             duration: Duration in seconds - if None, uses end_time
             end_time: End time in seconds - if None, uses duration
+            scratch_dir: Directory for the partial output - if None, next to output_path
             
         Returns:
             Path to the trimmed video file
         """
         try:
-            # Build command
-            cmd = ['ffmpeg', '-i', input_path, '-ss', str(start_time)]
+            spec = self.trim_output_spec(output_path, start_time, duration, end_time)
             
-            # Add duration or end time
-            if duration is not None:
-                cmd.extend(['-t', str(duration)])
-            elif end_time is not None:
-                cmd.extend(['-to', str(end_time)])
+            # Build command, seeking on the input so earlier packets are skipped
+            cmd = ['ffmpeg', *FFMPEG_QUIET_OPTIONS, '-ss', str(spec["seek"]), '-i', input_path]
+            cmd.extend(spec["args"])
             
-            # Copy streams without re-encoding for speed
-            cmd.extend([
-                '-c', 'copy',
-                '-y',
-                output_path
-            ])
+            with self._atomic_output(output_path, scratch_dir) as partial_path:
+                cmd.extend([
+                    '-y',
+                    partial_path
+                ])
+                
+                # Execute the command
+                _log_command(cmd)
+                subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
             
-            # Execute the command
-            subprocess.run(cmd, check=True, capture_output=True)
+            if self.drop_page_cache:
+                _drop_cache(input_path)
+                _drop_cache(output_path, sync=True)
             
             logger.info(f"Video trimmed to: {output_path}")
             return output_path
@@ -412,7 +1543,12 @@ def main():
     parser.add_argument("--crf", type=int, help="Constant Rate Factor (0-51, lower is better)")
     parser.add_argument("--audio-codec", help="Audio codec to use")
     parser.add_argument("--audio-bitrate", help="Audio bitrate (e.g., 128k)")
+    parser.add_argument("--threads", type=int, help="Encoder and filter thread count")
+    parser.add_argument("--scaler", help="Scaling algorithm (e.g., fast_bilinear, area)")
     parser.add_argument("--optimize", action="store_true", help="Optimize for analysis")
+    parser.add_argument("--no-hardware", action="store_true", help="Optimize with libx264 even if a hardware encoder is available")
+    parser.add_argument("--quality", choices=["analysis", "archive"], default="analysis",
+                        help="Optimize for fast analysis (H.264) or smaller archival files (SVT-AV1/x265)")
     parser.add_argument("--thumbnail", action="store_true", help="Extract thumbnail")
     parser.add_argument("--time-offset", type=float, default=0.0, help="Time offset for thumbnail")
     parser.add_argument("--trim", action="store_true", help="Trim video")
@@ -433,7 +1569,38 @@ def main():
     try:
         converter = VideoConverter()
         
-        if args.thumbnail:
+        if args.thumbnail + args.trim + args.optimize > 1:
+            # Several operations on one input: run them in a single FFmpeg pass
+            if args.output:
+                logger.warning("--output is ignored when combining operations; using default output names")
+            
+            base, ext = os.path.splitext(args.input)
+            outputs = []
+            if args.thumbnail:
+                outputs.append(converter.thumbnail_output_spec(
+                    video_path=args.input,
+                    time_offset=args.time_offset,
+                    width=args.width,
+                    height=args.height
+                ))
+            if args.trim:
+                outputs.append(converter.trim_output_spec(
+                    output_path=f"{base}_trimmed{ext}",
+                    start_time=args.start_time or 0.0,
+                    duration=args.duration,
+                    end_time=args.end_time
+                ))
+            if args.optimize:
+                outputs.append(converter.optimize_output_spec(
+                    input_path=args.input,
+                    max_dimension=args.width or 1280,
+                    use_hardware=not args.no_hardware,
+                    quality=args.quality
+                ))
+            
+            args.output = ", ".join(converter.multi_output(args.input, outputs))
+            
+        elif args.thumbnail:
             # Extract thumbnail
             if not args.output:
                 base, ext = os.path.splitext(args.input)
@@ -473,7 +1640,10 @@ def main():
             converter.optimize_for_analysis(
                 input_path=args.input,
                 output_path=args.output,
-                max_dimension=args.width or 1280
+                max_dimension=args.width or 1280,
+                threads=args.threads,
+                use_hardware=not args.no_hardware,
+                quality=args.quality
             )
             
         else:
@@ -494,7 +1664,9 @@ def main():
                 preset=args.preset,
                 crf=args.crf,
                 audio_codec=args.audio_codec,
-                audio_bitrate=args.audio_bitrate
+                audio_bitrate=args.audio_bitrate,
+                threads=args.threads,
+                scaler=args.scaler
             )
         
         logger.info(f"Operation completed successfully: {args.output}")
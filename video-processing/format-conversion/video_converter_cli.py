@@ -12,11 +12,14 @@ import os
 import sys
 import argparse
 import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from video_converter import VideoConverter
+from video_converter import VideoConverter, HWACCEL_PROFILES
 
 logger = logging.getLogger(__name__)
 
+VIDEO_EXTENSIONS = frozenset({'.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm'})
+
 def setup_logging(verbose=False):
     """Configure logging."""
     log_level = logging.DEBUG if verbose else logging.INFO
@@ -105,6 +108,12 @@ def parse_arguments():
         help="Constant Rate Factor (0-51, lower is better quality)"
     )
     
+    quality_group.add_argument(
+        "--hwaccel",
+        choices=list(HWACCEL_PROFILES),
+        help="Decode and encode on hardware (H.264/HEVC encoders only)"
+    )
+    
     # Special operations
     operations_group = parser.add_argument_group("Special Operations")
     operations_group.add_argument(
@@ -172,6 +181,26 @@ def parse_arguments():
         help="Concatenate all input videos into a single output file"
     )
     
+    batch_group.add_argument(
+        "-j", "--jobs",
+        type=int,
+        help="Number of files to process in parallel "
+             "(default: number of CPUs divided by --threads-per-job)"
+    )
+    
+    batch_group.add_argument(
+        "--threads-per-job",
+        type=int,
+        help="FFmpeg threads for each parallel job "
+             "(default: number of CPUs divided by --jobs, or 4 without --jobs)"
+    )
+    
+    batch_group.add_argument(
+        "--probe-cache",
+        metavar="DIR",
+        help="Keep ffprobe results in DIR so parallel jobs and later runs reuse them"
+    )
+    
     # Other options
     parser.add_argument(
         "--info",
@@ -187,9 +216,17 @@ def parse_arguments():
     
     return parser.parse_args()
 
-def process_video_file(converter, operation, input_path, output_path, args):
-    """Process a single video file based on the selected operation."""
+def process_video_file(converter, operation, input_path, output_path, args, threads=None, spec=None):
+    """
+    Process a single video file. Pass converter=None to create one (e.g. in a worker process).
+    
+    For conversions, spec can hold the options from VideoConverter.convert_spec,
+    built once for the whole batch.
+    """
     try:
+        if converter is None:
+            converter = VideoConverter(probe_cache_dir=args.probe_cache)
+        
         logger.info(f"Processing {input_path}")
         
         if operation == "info":
@@ -238,50 +275,68 @@ def process_video_file(converter, operation, input_path, output_path, args):
             return converter.optimize_for_analysis(
                 input_path=input_path,
                 output_path=output_path,
-                max_dimension=args.max_dimension
+                max_dimension=args.max_dimension,
+                threads=threads,
+                hwaccel=args.hwaccel
             )
             
         else:  # Standard conversion
+            if spec is None:
+                spec = build_convert_spec(converter, args, threads)
             return converter.convert_video(
                 input_path=input_path,
                 output_path=output_path,
-                format=args.format,
-                codec=args.codec,
-                width=args.width,
-                height=args.height,
-                fps=args.fps,
-                bitrate=args.bitrate,
-                preset=args.preset,
-                crf=args.crf,
-                audio_codec=args.audio_codec,
-                audio_bitrate=args.audio_bitrate
+                spec=spec
             )
     
     except Exception as e:
         logger.error(f"Error processing {input_path}: {str(e)}")
         return None
 
+def build_convert_spec(converter, args, threads=None):
+    """Build the conversion options from the command-line arguments."""
+    return converter.convert_spec(
+        format=args.format,
+        codec=args.codec,
+        width=args.width,
+        height=args.height,
+        fps=args.fps,
+        bitrate=args.bitrate,
+        preset=args.preset,
+        crf=args.crf,
+        audio_codec=args.audio_codec,
+        audio_bitrate=args.audio_bitrate,
+        threads=threads,
+        hwaccel=args.hwaccel
+    )
+
+def _scan_video_files(directory, recursive, video_files):
+    """Append video files in directory to video_files, in os.walk order."""
+    subdirs = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            # DirEntry caches the file type, so no extra stat per file
+            if entry.is_file():
+                if os.path.splitext(entry.name)[1].lower() in VIDEO_EXTENSIONS:
+                    video_files.append(entry.path)
+            elif recursive and entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+    
+    for subdir in subdirs:
+        try:
+            _scan_video_files(subdir, recursive, video_files)
+        except OSError as e:
+            # Like os.walk, skip subdirectories that cannot be read
+            logger.debug(f"Skipping {subdir}: {str(e)}")
+
 def find_video_files(input_path, recursive=False):
     """Find video files in the input path."""
     if os.path.isfile(input_path):
         return [input_path]
     
-    video_extensions = ['.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm']
-    
-    if recursive:
-        video_files = []
-        for root, _, files in os.walk(input_path):
-            for file in files:
-                if any(file.lower().endswith(ext) for ext in video_extensions):
-                    video_files.append(os.path.join(root, file))
-        return video_files
-    else:
-        return [
-            os.path.join(input_path, f) 
-            for f in os.listdir(input_path) 
-            if os.path.isfile(os.path.join(input_path, f)) and 
-            any(f.lower().endswith(ext) for ext in video_extensions)
-        ]
+    video_files = []
+    _scan_video_files(input_path, recursive, video_files)
+    return video_files
 
 def get_output_path(input_path, output_base, operation, format=None):
     """Determine output path based on input path and operation."""
@@ -326,7 +381,7 @@ def main():
     
     try:
         # Initialize the video converter
-        converter = VideoConverter()
+        converter = VideoConverter(probe_cache_dir=args.probe_cache)
         
         # Determine operation
         if args.info:
@@ -363,37 +418,85 @@ def main():
                 input_paths=video_files,
                 output_path=args.output,
                 format=args.format,
-                codec=args.codec
+                codec=args.codec,
+                hwaccel=args.hwaccel
             )
             
             logger.info(f"Concatenation complete: {args.output}")
             return
         
-        # Process each video file
-        success_count = 0
-        for video_file in video_files:
-            # Determine output path
-            output_path = get_output_path(
+        # Determine output path for each file
+        jobs = [
+            (video_file, get_output_path(
                 input_path=video_file,
                 output_base=args.output,
                 operation=operation,
                 format=args.format
-            )
-            
-            # Process the file
-            result = process_video_file(
-                converter=converter,
-                operation=operation,
-                input_path=video_file,
-                output_path=output_path,
-                args=args
-            )
-            
-            if result:
-                success_count += 1
-                logger.info(f"Successfully processed: {video_file} -> {output_path}")
-            else:
-                logger.error(f"Failed to process: {video_file}")
+            ))
+            for video_file in video_files
+        ]
+        
+        # Info only prints, so keep it in order; everything else runs one
+        # FFmpeg per worker, each capped at --threads-per-job threads
+        cpu_count = os.cpu_count() or 1
+        if args.threads_per_job:
+            threads_per_job = max(1, args.threads_per_job)
+        elif args.jobs:
+            # Share the CPUs between the requested jobs
+            threads_per_job = max(1, cpu_count // args.jobs)
+        else:
+            threads_per_job = 4
+        jobs_limit = args.jobs or cpu_count // threads_per_job
+        max_workers = max(1, min(jobs_limit, len(jobs)))
+        if operation == "info":
+            max_workers = 1
+        
+        # Every file gets the same conversion options, so build them once
+        spec = None
+        if operation == "convert":
+            spec = build_convert_spec(converter, args, threads_per_job if max_workers > 1 else None)
+        
+        # Process each video file
+        success_count = 0
+        if max_workers == 1:
+            for video_file, output_path in jobs:
+                result = process_video_file(
+                    converter=converter,
+                    operation=operation,
+                    input_path=video_file,
+                    output_path=output_path,
+                    args=args,
+                    spec=spec
+                )
+                
+                if result:
+                    success_count += 1
+                    logger.info(f"Successfully processed: {video_file} -> {output_path}")
+                else:
+                    logger.error(f"Failed to process: {video_file}")
+        else:
+            logger.info(f"Processing with {max_workers} parallel jobs")
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(
+                        process_video_file,
+                        None,
+                        operation,
+                        video_file,
+                        output_path,
+                        args,
+                        threads_per_job,
+                        spec
+                    ): (video_file, output_path)
+                    for video_file, output_path in jobs
+                }
+                for future in as_completed(futures):
+                    video_file, output_path = futures[future]
+                    if future.result():
+                        success_count += 1
+                        logger.info(f"Successfully processed: {video_file} -> {output_path}")
+                    else:
+                        logger.error(f"Failed to process: {video_file}")
         
         logger.info(f"Processing complete! Successfully processed {success_count} of {len(video_files)} files.")
         
@@ -8,16 +8,76 @@ This module provides functions to extract frames from video files for
 analysis with Pyunto Intelligence.
 """
 
+import math
 import os
+import json
 import subprocess
-import uuid
-from typing import Dict, Optional
-from pathlib import Path
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import logging
 import base64
+import contextlib
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # Only needed by extract_frames_as_array
 
 logger = logging.getLogger(__name__)
 
+# JPEG end-of-image marker. 0xFF bytes inside the entropy-coded data are
+# byte-stuffed, so in FFmpeg's MJPEG output it only ever ends a frame
+JPEG_EOI = b'\xff\xd9'
+
+# Read size (and pipe buffer size) for FFmpeg's stdout
+PIPE_CHUNK_SIZE = 1 << 20
+
+# With accurate timing, sample intervals at least this long (in seconds) are
+# served by one seek per frame rather than decoding the whole video. Keyframes
+# are usually a few seconds apart, so each seek decodes far less than the gap
+SEEK_SAMPLING_INTERVAL = 10.0
+
+# Threads used by save_frames to write frame files concurrently
+SAVE_WORKERS = 8
+
+# Size of the pieces in which in-memory video is written to FFmpeg's stdin
+STDIN_CHUNK_SIZE = 4 << 20
+
+
+def _is_streamable(video_data: bytes) -> bool:
+    """
+    Check whether FFmpeg can read the video from a pipe.
+    
+    Matroska/WebM, FLV and MPEG-TS are read front to back. MP4/MOV only work
+    when the moov index comes before the media data (faststart); otherwise
+    FFmpeg needs to seek, and from a pipe it silently yields no frames.
+    """
+    if video_data[:4] == b'\x1a\x45\xdf\xa3' or video_data[:3] == b'FLV':
+        return True
+    if len(video_data) > 188 and video_data[0] == 0x47 and video_data[188] == 0x47:
+        return True
+    if video_data[4:8] != b'ftyp':
+        return False
+    
+    # Walk the top-level boxes until either moov or mdat turns up
+    offset = 0
+    while offset + 8 <= len(video_data):
+        size = int.from_bytes(video_data[offset:offset + 4], 'big')
+        box_type = video_data[offset + 4:offset + 8]
+        if box_type == b'moov':
+            return True
+        if box_type == b'mdat':
+            return False
+        if size == 1:
+            size = int.from_bytes(video_data[offset + 8:offset + 16], 'big')
+        if size < 8:
+            return False
+        offset += size
+    return False
+
+
 class FrameExtractor:
     def __init__(self, temp_dir: str = "/tmp/pyunto_frames"):
         """
@@ -29,77 +89,404 @@ class FrameExtractor:
         self.temp_dir = temp_dir
         os.makedirs(temp_dir, exist_ok=True)
         
-    def _create_process_dir(self) -> str:
-        """Create a unique processing directory for the current job."""
-        process_id = str(uuid.uuid4())
-        process_dir = os.path.join(self.temp_dir, process_id)
-        os.makedirs(process_dir, exist_ok=True)
-        return process_dir
+    def _iter_frames(self, input_path: str, fps: float = 1, quality: int = 2,
+                     threads: Optional[int] = None,
+                     accurate_timing: bool = False,
+                     input_data: Optional[bytes] = None) -> Iterator[bytes]:
+        """
+        Run FFmpeg on a video file and yield each JPEG frame as it is encoded.
+        
+        Frames are streamed over stdout as MJPEG, so nothing touches the disk.
+        For fps < 1 only keyframes are decoded unless accurate_timing is set.
+        
+        Args:
+            input_path: Path to the video file passed to FFmpeg
+            fps: Frames per second to extract (default: 1)
+            quality: JPEG quality setting (1-31, lower is better quality, default: 2)
+            threads: Number of FFmpeg threads (default: let FFmpeg decide)
+            accurate_timing: Decode every frame for fps < 1 instead of sampling keyframes
+            input_data: Video data to feed to FFmpeg's stdin, with input_path 'pipe:0'
+            
+        Yields:
+            Encoded JPEG images in presentation order
+        """
+        cmd = self._decode_args(input_path, fps, threads, accurate_timing)
+        cmd.extend([
+            '-qscale:v', str(quality),  # Set JPEG quality
+            '-f', 'image2pipe', '-vcodec', 'mjpeg', 'pipe:1'
+        ])
+        
+        with self._run_ffmpeg(cmd, input_data) as process:
+            buffer = bytearray()
+            search_from = 0
+            while True:
+                chunk = process.stdout.read1(PIPE_CHUNK_SIZE)
+                if not chunk:
+                    break
+                buffer += chunk
+                
+                # Cut out every complete image; the tail waits for more data
+                while True:
+                    end = buffer.find(JPEG_EOI, search_from)
+                    if end < 0:
+                        # A marker may straddle two chunks
+                        search_from = max(0, len(buffer) - 1)
+                        break
+                    end += len(JPEG_EOI)
+                    yield bytes(buffer[:end])
+                    del buffer[:end]
+                    search_from = 0
+
+    def _decode_args(self, input_path: str, fps: float, threads: Optional[int] = None,
+                     accurate_timing: bool = False) -> List[str]:
+        """Build the FFmpeg arguments that decode and sample a video, up to the output options."""
+        cmd = ['ffmpeg', '-hide_banner', '-nostats', '-loglevel', 'error']
+        
+        if fps < 1 and not accurate_timing:
+            # Sparse sampling: decode keyframes only and keep the first one
+            # at least 1/fps after the previous pick. Frame times snap to
+            # keyframes, and a GOP longer than 1/fps yields fewer frames
+            interval = 1 / fps
+            cmd.extend([
+                '-skip_frame', 'nokey', '-i', input_path,
+                '-vf', f"select='isnan(prev_selected_t)+gte(t-prev_selected_t,{interval})'",
+                '-vsync', 'vfr',
+            ])
+        else:
+            cmd.extend([
+                '-i', input_path,
+                '-vf', f"fps={fps}",  # Extract frames at specified FPS
+            ])
+        
+        # Cap FFmpeg's threads when several extractions share the CPU
+        if threads:
+            cmd.extend(['-threads', str(threads)])
+        
+        return cmd
 
-    def _clean_process_dir(self, process_dir: str):
-        """Clean up temporary processing directory."""
+    @contextlib.contextmanager
+    def _run_ffmpeg(self, cmd: List[str], input_data: Optional[bytes] = None) -> Iterator[subprocess.Popen]:
+        """
+        Run FFmpeg with its output on a pipe and check how it exited.
+        
+        The caller reads process.stdout inside the block. If the block is left
+        early the process is killed; otherwise a non-zero exit status raises
+        CalledProcessError with FFmpeg's stderr. input_data, if given, is
+        written to FFmpeg's stdin from a background thread.
+        """
+        # stderr goes to a file so a chatty FFmpeg can never block on a full pipe
+        with tempfile.TemporaryFile() as stderr_file:
+            process = subprocess.Popen(
+                cmd,
+                stdin=subprocess.DEVNULL if input_data is None else subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=stderr_file,
+                bufsize=PIPE_CHUNK_SIZE
+            )
+            
+            feeder = None
+            if input_data is not None:
+                def feed():
+                    # Slices of a memoryview are written without copying the data
+                    view = memoryview(input_data)
+                    try:
+                        for offset in range(0, len(view), STDIN_CHUNK_SIZE):
+                            process.stdin.write(view[offset:offset + STDIN_CHUNK_SIZE])
+                        process.stdin.close()
+                    except OSError:
+                        pass  # FFmpeg stopped reading; its exit status tells why
+                
+                feeder = threading.Thread(target=feed, daemon=True)
+                feeder.start()
+            
+            try:
+                yield process
+                
+                process.stdout.close()
+                returncode = process.wait()
+                if returncode != 0:
+                    stderr_file.seek(0)
+                    raise subprocess.CalledProcessError(returncode, cmd, stderr=stderr_file.read())
+            finally:
+                # The consumer may stop early; don't leave FFmpeg running
+                if process.poll() is None:
+                    process.kill()
+                    process.wait()
+                if feeder is not None:
+                    feeder.join()
+
+    def _extract_frames(self, input_path: str, fps: float = 1, quality: int = 2,
+                        threads: Optional[int] = None,
+                        accurate_timing: bool = False,
+                        input_data: Optional[bytes] = None) -> Dict[int, bytes]:
+        """
+        Extract all frames of a video file into memory.
+        
+        Args:
+            input_path: Path to the video file passed to FFmpeg
+            fps: Frames per second to extract (default: 1)
+            quality: JPEG quality setting (1-31, lower is better quality, default: 2)
+            threads: Number of FFmpeg threads (default: let FFmpeg decide)
+            accurate_timing: Decode every frame for fps < 1 instead of sampling
+                keyframes; intervals of SEEK_SAMPLING_INTERVAL or more seek to each frame
+            input_data: Video data to feed to FFmpeg's stdin, with input_path 'pipe:0'
+            
+        Returns:
+            Dictionary mapping frame numbers to frame image data
+        """
         try:
-            subprocess.run(['rm', '-rf', process_dir], check=True)
+            # Seeking needs a file, so piped input always takes the linear path
+            if (accurate_timing and input_data is None
+                    and fps > 0 and 1 / fps >= SEEK_SAMPLING_INTERVAL):
+                duration = self._probe_duration(input_path)
+                if duration:
+                    times = [i / fps for i in range(math.ceil(duration * fps))]
+                    return self.extract_frames_at_times(input_path, times, quality, threads)
+            
+            return dict(enumerate(
+                self._iter_frames(input_path, fps, quality, threads, accurate_timing, input_data), 1
+            ))
+
         except subprocess.CalledProcessError as e:
-            logger.error(f"Failed to clean process directory: {e}")
+            logger.error(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
+            raise
+        except Exception as e:
+            logger.error(f"Error extracting frames: {str(e)}")
+            raise
 
-    def extract_frames(self, video_data: bytes, fps: float = 1, quality: int = 2) -> Dict[int, bytes]:
+    def _probe_duration(self, input_path: str) -> Optional[float]:
+        """Return the container duration in seconds, or None if it is unknown."""
+        result = subprocess.run([
+            'ffprobe', '-v', 'error',
+            '-show_entries', 'format=duration',
+            '-of', 'default=noprint_wrappers=1:nokey=1',
+            input_path
+        ], check=True, capture_output=True)
+        try:
+            return float(result.stdout.strip())
+        except ValueError:
+            return None
+
+    def _probe_frame_geometry(self, input_path: str) -> Tuple[int, int, Optional[float]]:
+        """Return the displayed width and height of the first video stream and the duration."""
+        result = subprocess.run([
+            'ffprobe', '-v', 'error', '-select_streams', 'v:0',
+            '-print_format', 'json',
+            '-show_entries', 'format=duration:stream=width,height:stream_side_data=rotation:stream_tags=rotate',
+            input_path
+        ], check=True, capture_output=True)
+        info = json.loads(result.stdout)
+        
+        streams = info.get('streams') or [{}]
+        stream = streams[0]
+        width, height = int(stream['width']), int(stream['height'])
+        
+        # FFmpeg applies the display rotation while decoding, so frames of a
+        # portrait phone video come out with width and height swapped
+        rotation = stream.get('tags', {}).get('rotate', 0)
+        for side_data in stream.get('side_data_list', []):
+            rotation = side_data.get('rotation', rotation)
+        if int(float(rotation)) % 180:
+            width, height = height, width
+        
+        try:
+            duration = float(info.get('format', {}).get('duration'))
+        except (TypeError, ValueError):
+            duration = None
+        
+        return width, height, duration
+
+    def _extract_frame_at(self, input_path: str, time_offset: float, quality: int = 2) -> bytes:
+        """Seek to time_offset and encode the frame there as JPEG (empty past the end)."""
+        result = subprocess.run([
+            'ffmpeg', '-hide_banner', '-nostats', '-loglevel', 'error',
+            '-ss', f"{time_offset:.3f}",  # Input-side seek: jump to the keyframe before it
+            '-i', input_path,
+            '-frames:v', '1',
+            '-qscale:v', str(quality),
+            '-threads', '1',  # Parallelism comes from running several seeks at once
+            '-f', 'image2pipe', '-vcodec', 'mjpeg', 'pipe:1'
+        ], stdin=subprocess.DEVNULL, check=True, capture_output=True)
+        return result.stdout
+
+    def extract_frames_at_times(self, video_file_path: str, times: List[float], quality: int = 2,
+                                max_workers: Optional[int] = None) -> Dict[int, bytes]:
+        """
+        Extract the frames at the given times, one seek per frame.
+        
+        Each frame is a short FFmpeg run that seeks to the nearest keyframe
+        and decodes from there, so sparse samples of a long video cost a few
+        frames of decoding each instead of a pass over the whole file.
+        
+        Args:
+            video_file_path: Path to the video file
+            times: Time offsets in seconds
+            quality: JPEG quality setting (1-31, lower is better quality, default: 2)
+            max_workers: Number of concurrent FFmpeg processes (default: number of CPUs)
+            
+        Returns:
+            Dictionary mapping frame numbers (in the order of times) to frame
+            image data; times past the end of the video are skipped
+        """
+        try:
+            # FFmpeg does the work in its own process, so threads are enough
+            with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count() or 1) as executor:
+                images = executor.map(
+                    lambda t: self._extract_frame_at(video_file_path, t, quality), times
+                )
+                frames = {}
+                for image in images:
+                    if image:
+                        frames[len(frames) + 1] = image
+                return frames
+
+        except subprocess.CalledProcessError as e:
+            logger.error(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
+            raise
+        except Exception as e:
+            logger.error(f"Error extracting frames: {str(e)}")
+            raise
+
+    def extract_frames(self, video_data: bytes, fps: float = 1, quality: int = 2,
+                       threads: Optional[int] = None,
+                       accurate_timing: bool = False) -> Dict[int, bytes]:
         """
         Extract frames from video data.
         
+        Streamable data (Matroska/WebM, FLV, MPEG-TS, faststart MP4/MOV) is fed
+        to FFmpeg through a pipe. Other MP4/MOV files keep their index at the
+        end, which FFmpeg can only reach on a seekable input, so they are
+        spooled to disk first. Use extract_frames_from_path when the video is
+        already a file.
+        
         Args:
             video_data: Binary video data
             fps: Frames per second to extract (default: 1)
             quality: JPEG quality setting (1-31, lower is better quality, default: 2)
+            threads: Number of FFmpeg threads (default: let FFmpeg decide)
+            accurate_timing: Decode every frame for fps < 1 instead of sampling keyframes
             
         Returns:
             Dictionary mapping frame numbers to frame image data
         """
-        process_dir = self._create_process_dir()
-        try:
+        if _is_streamable(video_data):
+            return self._extract_frames('pipe:0', fps, quality, threads, accurate_timing,
+                                        input_data=video_data)
+        
+        # The directory and the spooled input are removed however we leave
+        with tempfile.TemporaryDirectory(dir=self.temp_dir) as process_dir:
             # Save input video temporarily
             input_path = os.path.join(process_dir, "input.mp4")
             with open(input_path, "wb") as f:
                 f.write(video_data)
 
-            # Extract frames using ffmpeg command
-            frames_dir = os.path.join(process_dir, "frames")
-            os.makedirs(frames_dir, exist_ok=True)
-            frames_path = os.path.join(frames_dir, "frame_%d.jpg")
+            return self._extract_frames(input_path, fps, quality, threads, accurate_timing)
             
-            # Construct the fps filter value
-            fps_filter = f"fps={fps}"
-            
-            # Construct the quality value (qscale)
-            qscale = str(quality)
+    def extract_frames_from_path(self, video_file_path: str, fps: float = 1, quality: int = 2,
+                                 threads: Optional[int] = None,
+                                 accurate_timing: bool = False) -> Dict[int, bytes]:
+        """
+        Extract frames from a video file, letting FFmpeg read it in place.
+        
+        Args:
+            video_file_path: Path to the video file
+            fps: Frames per second to extract (default: 1)
+            quality: JPEG quality setting (1-31, lower is better quality, default: 2)
+            threads: Number of FFmpeg threads (default: let FFmpeg decide)
+            accurate_timing: Decode every frame for fps < 1 instead of sampling keyframes
             
-            subprocess.run([
-                'ffmpeg', '-i', input_path,
-                '-vf', fps_filter,  # Extract frames at specified FPS
-                '-qscale:v', qscale,  # Set JPEG quality
-                '-y',  # Overwrite output files
-                frames_path
-            ], check=True, capture_output=True)
-
-            # Read frame data
-            frames = {}
-            frame_files = sorted(Path(frames_dir).glob("frame_*.jpg"))
-            for i, frame_path in enumerate(frame_files, 1):
-                with open(frame_path, "rb") as f:
-                    frames[i] = f.read()
+        Returns:
+            Dictionary mapping frame numbers to frame image data
+        """
+        return self._extract_frames(video_file_path, fps, quality, threads, accurate_timing)
 
-            return frames
+    def iter_frames_from_path(self, video_file_path: str, fps: float = 1, quality: int = 2,
+                              threads: Optional[int] = None,
+                              accurate_timing: bool = False) -> Iterator[Tuple[int, bytes]]:
+        """
+        Yield frames from a video file as FFmpeg produces them.
+        
+        Unlike extract_frames_from_path, frames can be consumed before the
+        whole video has been decoded, and only one is held in memory at a time.
+        
+        Args:
+            video_file_path: Path to the video file
+            fps: Frames per second to extract (default: 1)
+            quality: JPEG quality setting (1-31, lower is better quality, default: 2)
+            threads: Number of FFmpeg threads (default: let FFmpeg decide)
+            accurate_timing: Decode every frame for fps < 1 instead of sampling keyframes
+            
+        Yields:
+            Tuples of (frame number, frame image data)
+        """
+        yield from enumerate(self._iter_frames(video_file_path, fps, quality, threads, accurate_timing), 1)
 
+    def extract_frames_as_array(self, video_file_path: str, fps: float = 1,
+                                threads: Optional[int] = None,
+                                accurate_timing: bool = False) -> "np.ndarray":
+        """
+        Extract frames from a video file as decoded RGB pixels.
+        
+        FFmpeg writes raw rgb24 frames straight into a NumPy array, which
+        saves encoding JPEGs only for an image pipeline to decode them again.
+        Frames are lossless, but take width * height * 3 bytes each.
+        
+        Args:
+            video_file_path: Path to the video file
+            fps: Frames per second to extract (default: 1)
+            threads: Number of FFmpeg threads (default: let FFmpeg decide)
+            accurate_timing: Decode every frame for fps < 1 instead of sampling keyframes
+            
+        Returns:
+            uint8 array of shape (frames, height, width, 3)
+        """
+        if np is None:
+            raise ImportError("Extracting frames as arrays requires NumPy. Install it with 'pip install numpy'")
+        
+        try:
+            width, height, duration = self._probe_frame_geometry(video_file_path)
+            frame_size = width * height * 3
+            
+            cmd = self._decode_args(video_file_path, fps, threads, accurate_timing)
+            cmd.extend(['-f', 'rawvideo', '-pix_fmt', 'rgb24', 'pipe:1'])
+            
+            # Size the array for the expected frame count and grow it if needed
+            capacity = math.ceil(duration * fps) + 1 if duration else 16
+            frames = np.empty((capacity, height, width, 3), dtype=np.uint8)
+            count = 0
+            
+            with self._run_ffmpeg(cmd) as process:
+                while True:
+                    if count == len(frames):
+                        frames = np.concatenate([frames, np.empty_like(frames)])
+                    
+                    # Read the next frame directly into its slot in the array
+                    view = memoryview(frames[count]).cast('B')
+                    filled = 0
+                    while filled < frame_size:
+                        n = process.stdout.readinto(view[filled:])
+                        if not n:
+                            break
+                        filled += n
+                    
+                    if filled == 0:
+                        break
+                    if filled < frame_size:
+                        raise ValueError(f"FFmpeg output ended mid-frame ({filled} of {frame_size} bytes)")
+                    count += 1
+            
+            return frames[:count]
+        
         except subprocess.CalledProcessError as e:
             logger.error(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
             raise
         except Exception as e:
             logger.error(f"Error extracting frames: {str(e)}")
             raise
-        finally:
-            self._clean_process_dir(process_dir)
-            
-    def extract_frames_from_file(self, video_file_path: str, fps: float = 1, quality: int = 2) -> Dict[int, bytes]:
+
+    def extract_frames_from_file(self, video_file_path: str, fps: float = 1, quality: int = 2,
+                                 threads: Optional[int] = None,
+                                 accurate_timing: bool = False) -> Dict[int, bytes]:
         """
         Extract frames from a video file.
         
@@ -107,13 +494,13 @@ class FrameExtractor:
             video_file_path: Path to the video file
             fps: Frames per second to extract (default: 1)
             quality: JPEG quality setting (1-31, lower is better quality, default: 2)
+            threads: Number of FFmpeg threads (default: let FFmpeg decide)
+            accurate_timing: Decode every frame for fps < 1 instead of sampling keyframes
             
         Returns:
             Dictionary mapping frame numbers to frame image data
         """
-        with open(video_file_path, "rb") as f:
-            video_data = f.read()
-        return self.extract_frames(video_data, fps, quality)
+        return self.extract_frames_from_path(video_file_path, fps, quality, threads, accurate_timing)
     
     def save_frames(self, frames: Dict[int, bytes], output_dir: str, 
                    prefix: str = "frame_", format: str = "jpg") -> Dict[int, str]:
@@ -131,14 +518,22 @@ class FrameExtractor:
         """
         os.makedirs(output_dir, exist_ok=True)
         
-        frame_paths = {}
-        for frame_num, frame_data in frames.items():
+        def write_frame(item: Tuple[int, bytes]) -> Tuple[int, str]:
+            frame_num, frame_data = item
             frame_path = os.path.join(output_dir, f"{prefix}{frame_num}.{format}")
-            with open(frame_path, "wb") as f:
-                f.write(frame_data)
-            frame_paths[frame_num] = frame_path
-            
-        return frame_paths
+            # Plain file descriptor writes skip building a file object per frame
+            fd = os.open(frame_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                view = memoryview(frame_data)
+                while view:
+                    view = view[os.write(fd, view):]
+            finally:
+                os.close(fd)
+            return frame_num, frame_path
+        
+        # Writes release the GIL, so several threads overlap their latency
+        with ThreadPoolExecutor(max_workers=SAVE_WORKERS) as executor:
+            return dict(executor.map(write_frame, frames.items()))
     
     def frames_to_base64(self, frames: Dict[int, bytes]) -> Dict[str, Dict[str, str]]:
         """
@@ -150,13 +545,28 @@ class FrameExtractor:
         Returns:
             Dictionary with base64-encoded frames ready for API transmission
         """
-        return {
-            str(frame_num): {
-                "data": base64.b64encode(frame_data).decode('utf-8'),
+        return dict(self.frames_to_base64_iter(frames.items()))
+
+    def frames_to_base64_iter(self, frames: Iterable[Tuple[int, bytes]]) -> Iterator[Tuple[str, Dict[str, str]]]:
+        """
+        Lazily convert frames to base64 for API transmission.
+        
+        Fed from iter_frames_from_path, only one frame is held at a time -
+        raw or encoded - so callers streaming to an HTTP client stay small.
+        
+        Args:
+            frames: Iterable of (frame number, frame image data) pairs
+            
+        Yields:
+            (frame number, encoded frame) pairs in the frames_to_base64 format
+        """
+        b64encode = base64.b64encode
+        for frame_num, frame_data in frames:
+            # base64 output is pure ASCII, which decodes faster than UTF-8
+            yield str(frame_num), {
+                "data": b64encode(frame_data).decode('ascii'),
                 "mimeType": "image/jpeg"
             }
-            for frame_num, frame_data in frames.items()
-        }
 
 
 def main():
@@ -172,6 +582,8 @@ def main():
                         help="JPEG quality (1-31, lower is better, default: 2)")
     parser.add_argument("--output-dir", default="./frames", 
                         help="Directory to save extracted frames")
+    parser.add_argument("--accurate-timing", action="store_true",
+                        help="Decode every frame when --fps is below 1 instead of sampling keyframes")
     
     args = parser.parse_args()
     
@@ -185,10 +597,11 @@ def main():
         extractor = FrameExtractor()
         logger.info(f"Extracting frames from {args.video_path} at {args.fps} fps...")
         
-        frames = extractor.extract_frames_from_file(
+        frames = extractor.extract_frames_from_path(
             args.video_path, 
             fps=args.fps,
-            quality=args.quality
+            quality=args.quality,
+            accurate_timing=args.accurate_timing
         )
         
         frame_paths = extractor.save_frames(frames, args.output_dir)
@@ -12,11 +12,14 @@ import os
 import sys
 import argparse
 import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from frame_extractor import FrameExtractor
 
 logger = logging.getLogger(__name__)
 
+VIDEO_EXTENSIONS = frozenset({'.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm'})
+
 def setup_logging(verbose=False):
     """Configure logging."""
     log_level = logging.DEBUG if verbose else logging.INFO
@@ -71,12 +74,33 @@ def parse_arguments():
         help="Output image format (default: jpg)"
     )
     
+    parser.add_argument(
+        "--accurate-timing",
+        action="store_true",
+        help="Decode every frame when --fps is below 1 instead of sampling "
+             "keyframes (slower, but frame times are exact)"
+    )
+    
     parser.add_argument(
         "--recursive",
         action="store_true",
         help="Process videos in subdirectories recursively"
     )
     
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        help="Number of files to process in parallel "
+             "(default: number of CPUs divided by --threads-per-job)"
+    )
+    
+    parser.add_argument(
+        "--threads-per-job",
+        type=int,
+        help="FFmpeg threads for each parallel job "
+             "(default: number of CPUs divided by --jobs, or 4 without --jobs)"
+    )
+    
     parser.add_argument(
         "-v", "--verbose",
         action="store_true",
@@ -85,9 +109,13 @@ def parse_arguments():
     
     return parser.parse_args()
 
-def process_video_file(extractor, video_path, output_dir, fps, quality, prefix, format):
-    """Process a single video file."""
+def process_video_file(extractor, video_path, output_dir, fps, quality, prefix, format, threads=None,
+                       accurate_timing=False):
+    """Process a single video file. Pass extractor=None to create one (e.g. in a worker process)."""
     try:
+        if extractor is None:
+            extractor = FrameExtractor()
+        
         # Create output directory structure mirroring input if needed
         rel_path = os.path.dirname(video_path)
         if rel_path:
@@ -106,10 +134,12 @@ def process_video_file(extractor, video_path, output_dir, fps, quality, prefix,
         logger.info(f"Extracting frames at {fps} fps with quality {quality}")
         
         # Extract frames
-        frames = extractor.extract_frames_from_file(
+        frames = extractor.extract_frames_from_path(
             video_path,
             fps=fps,
-            quality=quality
+            quality=quality,
+            threads=threads,
+            accurate_timing=accurate_timing
         )
         
         # Save frames
@@ -127,27 +157,33 @@ def process_video_file(extractor, video_path, output_dir, fps, quality, prefix,
         logger.error(f"Error processing {video_path}: {str(e)}")
         return 0
 
+def _scan_video_files(directory, recursive, video_files):
+    """Append video files in directory to video_files, in os.walk order."""
+    subdirs = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            # DirEntry caches the file type, so no extra stat per file
+            if entry.is_file():
+                if os.path.splitext(entry.name)[1].lower() in VIDEO_EXTENSIONS:
+                    video_files.append(entry.path)
+            elif recursive and entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+    
+    for subdir in subdirs:
+        try:
+            _scan_video_files(subdir, recursive, video_files)
+        except OSError as e:
+            # Like os.walk, skip subdirectories that cannot be read
+            logger.debug(f"Skipping {subdir}: {str(e)}")
+
 def find_video_files(input_path, recursive=False):
     """Find video files in the input path."""
     if os.path.isfile(input_path):
         return [input_path]
     
-    video_extensions = ['.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm']
-    
-    if recursive:
-        video_files = []
-        for root, _, files in os.walk(input_path):
-            for file in files:
-                if any(file.lower().endswith(ext) for ext in video_extensions):
-                    video_files.append(os.path.join(root, file))
-        return video_files
-    else:
-        return [
-            os.path.join(input_path, f) 
-            for f in os.listdir(input_path) 
-            if os.path.isfile(os.path.join(input_path, f)) and 
-            any(f.lower().endswith(ext) for ext in video_extensions)
-        ]
+    video_files = []
+    _scan_video_files(input_path, recursive, video_files)
+    return video_files
 
 def main():
     """Main function for the command-line interface."""
@@ -170,19 +206,53 @@ def main():
         
         logger.info(f"Found {len(video_files)} video files to process")
         
+        # Run one FFmpeg per worker, each capped at --threads-per-job threads
+        cpu_count = os.cpu_count() or 1
+        if args.threads_per_job:
+            threads_per_job = max(1, args.threads_per_job)
+        elif args.jobs:
+            # Share the CPUs between the requested jobs
+            threads_per_job = max(1, cpu_count // args.jobs)
+        else:
+            threads_per_job = 4
+        jobs_limit = args.jobs or cpu_count // threads_per_job
+        max_workers = max(1, min(jobs_limit, len(video_files)))
+        
         # Process each video file
         total_frames = 0
-        for video_file in video_files:
-            frames_extracted = process_video_file(
-                extractor,
-                video_file,
-                args.output_dir,
-                args.fps,
-                args.quality,
-                args.prefix,
-                args.format
-            )
-            total_frames += frames_extracted
+        if max_workers == 1:
+            for video_file in video_files:
+                frames_extracted = process_video_file(
+                    extractor,
+                    video_file,
+                    args.output_dir,
+                    args.fps,
+                    args.quality,
+                    args.prefix,
+                    args.format,
+                    accurate_timing=args.accurate_timing
+                )
+                total_frames += frames_extracted
+        else:
+            logger.info(f"Processing with {max_workers} parallel jobs")
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [
+                    executor.submit(
+                        process_video_file,
+                        None,
+                        video_file,
+                        args.output_dir,
+                        args.fps,
+                        args.quality,
+                        args.prefix,
+                        args.format,
+                        threads_per_job,
+                        args.accurate_timing
+                    )
+                    for video_file in video_files
+                ]
+                for future in as_completed(futures):
+                    total_frames += future.result()
         
         logger.info(f"Processing complete! Extracted {total_frames} frames in total.")
         